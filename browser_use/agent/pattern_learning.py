@@ -12,7 +12,6 @@ Key components:
 
 from __future__ import annotations
 
-import json
 import logging
 import os
 from datetime import date
@@ -192,15 +191,13 @@ class PatternStore:
 			return PatternFile()
 
 		try:
-			with open(self.path, encoding='utf-8') as f:
-				data = json.load(f)
-
-			self._cached_data = PatternFile.model_validate(data)
+			# Parse and validate in one pass inside pydantic-core
+			self._cached_data = PatternFile.model_validate_json(self.path.read_bytes())
 			return self._cached_data
 
-		except json.JSONDecodeError as e:
-			raise ValueError(f'Invalid JSON in patterns file {self.path}: {e}') from e
 		except ValidationError as e:
+			if any(error['type'] == 'json_invalid' for error in e.errors()):
+				raise ValueError(f'Invalid JSON in patterns file {self.path}: {e}') from e
 			raise ValueError(f'Invalid patterns file schema {self.path}: {e}') from e
 
 	def save(self, data: PatternFile) -> None:
@@ -221,9 +218,8 @@ class PatternStore:
 		temp_path = self.path.with_suffix('.json.tmp')
 
 		try:
-			# Write to temp file
-			with open(temp_path, 'w', encoding='utf-8') as f:
-				json.dump(data.model_dump(), f, indent=2)
+			# Write to temp file using the model's own pydantic-core serializer
+			temp_path.write_bytes(data.model_dump_json(indent=2).encode())
 
 			# Backup existing file if it exists
 			if self.path.exists():
@@ -265,9 +261,9 @@ class PatternStore:
 			if not session_content.strip():
 				return 0
 
-			session_data = PatternFile.model_validate(json.loads(session_content))
+			session_data = PatternFile.model_validate_json(session_content)
 
-		except (json.JSONDecodeError, ValidationError) as e:
+		except ValidationError as e:
 			logger.warning(f'Invalid session patterns, skipping merge: {e}')
 			return 0
 
@@ -279,15 +275,14 @@ class PatternStore:
 		today = date.today().isoformat()
 
 		for domain, domain_patterns in session_data.patterns.items():
-			if domain not in existing.patterns:
-				existing.patterns[domain] = {}
+			merged_patterns = existing.patterns.setdefault(domain, {})
 
 			for pattern_type, pattern_entry in domain_patterns.items():
 				# Update last_success to today
 				pattern_entry.last_success = today
 
 				# Add or update pattern
-				existing.patterns[domain][pattern_type] = pattern_entry
+				merged_patterns[pattern_type] = pattern_entry
 				count += 1
 				logger.debug(f'Merged pattern: {domain}/{pattern_type}')
 
@@ -315,11 +310,8 @@ class PatternStore:
 
 		for workflow in workflows:
 			domain = workflow.domain or '_global'
-			if domain not in existing.workflows:
-				existing.workflows[domain] = {}
-
 			workflow.last_success = today
-			existing.workflows[domain][workflow.id] = workflow
+			existing.workflows.setdefault(domain, {})[workflow.id] = workflow
 			count += 1
 			logger.debug(f'Merged workflow: {domain}/{workflow.id}')
 
@@ -2,6 +2,7 @@
 
 import asyncio
 import logging
+import weakref
 from functools import cached_property
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Literal, Self, Union, cast, overload
@@ -89,6 +90,7 @@ class CDPSession(BaseModel):
 	# Lifecycle monitoring (populated by SessionManager)
 	_lifecycle_events: Any = PrivateAttr(default=None)
 	_lifecycle_lock: Any = PrivateAttr(default=None)
+	_lifecycle_signal: Any = PrivateAttr(default=None)  # asyncio.Event set whenever a lifecycle event is stored
 
 
 class BrowserSession(BaseModel):
@@ -421,6 +423,10 @@ class BrowserSession(BaseModel):
 
 	_cached_browser_state_summary: Any = PrivateAttr(default=None)
 	_cached_selector_map: dict[int, EnhancedDOMTreeNode] = PrivateAttr(default_factory=dict)
+	# extract_clean_markdown results: (extract_links, skip_json_filtering, include_interactive) -> (weakref to dom tree, content, stats)
+	_cached_markdown: dict[tuple[bool, bool, bool], tuple[weakref.ref[Any], str, dict[str, Any]]] = PrivateAttr(
+		default_factory=dict
+	)
 	_downloaded_files: list[str] = PrivateAttr(default_factory=list)  # Track files downloaded during this session
 	_closed_popup_messages: list[str] = PrivateAttr(default_factory=list)  # Store messages from auto-closed JavaScript dialogs
 
@@ -499,6 +505,7 @@ class BrowserSession(BaseModel):
 		self._cdp_client_root = None  # type: ignore
 		self._cached_browser_state_summary = None
 		self._cached_selector_map.clear()
+		self._cached_markdown.clear()
 		self._downloaded_files.clear()
 
 		self.agent_focus_target_id = None
@@ -808,7 +815,8 @@ class BrowserSession(BaseModel):
 		This gives us instant returns for cached content while being robust for dynamic pages.
 
 		NO handler registration here - handlers are registered ONCE per session in SessionManager.
-		We poll stored events instead to avoid handler accumulation.
+		The handler stores events and sets the session's lifecycle signal, so we sleep until an
+		event arrives instead of polling on a fixed interval.
 		"""
 		cdp_session = await self.get_or_create_cdp_session(target_id, focus=False)
 
@@ -838,7 +846,6 @@ class BrowserSession(BaseModel):
 		navigation_id = nav_result.get('loaderId')
 		start_time = asyncio.get_event_loop().time()
 
-		# Poll stored lifecycle events
 		seen_events = []  # Track events for timeout diagnostics
 
 		# Check if session has lifecycle monitoring enabled
@@ -848,11 +855,13 @@ class BrowserSession(BaseModel):
 				f'This is a bug - SessionManager should have initialized it. '
 				f'Session: {cdp_session}'
 			)
+		# Monitoring setup can fail for targets that detached early; an unset event then just runs out the timeout
+		lifecycle_signal = cdp_session._lifecycle_signal or asyncio.Event()
 
-		# Poll for lifecycle events until timeout
-		poll_interval = 0.05  # Poll every 50ms
-		while (asyncio.get_event_loop().time() - start_time) < timeout:
-			# Check stored events
+		# Scan stored lifecycle events, then sleep until the handler signals a new one
+		while True:
+			# Clear before scanning so an event stored mid-scan still wakes the next wait
+			lifecycle_signal.clear()
 			try:
 				# Get recent events matching our navigation
 				for event_data in list(cdp_session._lifecycle_events):
@@ -879,10 +888,15 @@ class BrowserSession(BaseModel):
 						return
 
 			except Exception as e:
-				self.logger.debug(f'Error polling lifecycle events: {e}')
+				self.logger.debug(f'Error reading lifecycle events: {e}')
 
-			# Wait before next poll
-			await asyncio.sleep(poll_interval)
+			remaining = timeout - (asyncio.get_event_loop().time() - start_time)
+			if remaining <= 0:
+				break
+			try:
+				await asyncio.wait_for(lifecycle_signal.wait(), timeout=remaining)
+			except TimeoutError:
+				break
 
 		# Timeout - raise to signal navigation may have failed
 		duration_ms = (asyncio.get_event_loop().time() - nav_start_time) * 1000
@@ -1003,6 +1017,7 @@ class BrowserSession(BaseModel):
 			self._dom_watchdog.clear_cache()
 		self._cached_browser_state_summary = None
 		self._cached_selector_map.clear()
+		self._cached_markdown.clear()
 
 	async def on_AgentFocusChangedEvent(self, event: AgentFocusChangedEvent) -> None:
 		"""Handle agent focus change - update focus and clear cache."""
@@ -1015,6 +1030,7 @@ class BrowserSession(BaseModel):
 		# Clear cached browser state
 		self._cached_browser_state_summary = None
 		self._cached_selector_map.clear()
+		self._cached_markdown.clear()
 		self.logger.debug('Cached browser state cleared')
 
 		# Update agent focus if a specific target_id is provided (only for page/tab targets)
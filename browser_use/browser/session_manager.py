@@ -853,6 +853,7 @@ class SessionManager:
 
 			cdp_session._lifecycle_events = deque(maxlen=50)  # Keep last 50 events
 			cdp_session._lifecycle_lock = asyncio.Lock()
+			cdp_session._lifecycle_signal = asyncio.Event()  # Wakes navigations waiting for new events
 
 			# Register ONE handler per session that stores events
 			def on_lifecycle_event(event, session_id=None):
@@ -875,6 +876,7 @@ class SessionManager:
 					# Append is atomic in CPython
 					try:
 						cdp_session._lifecycle_events.append(event_data)
+						cdp_session._lifecycle_signal.set()
 					except Exception as e:
 						# Only log errors, not every event
 						self.logger.error(f'[SessionManager] Failed to store lifecycle event: {e}')
@@ -32,12 +32,13 @@ class TabInfo(BaseModel):
 		default=None, serialization_alias='parent_tab_id', validation_alias=AliasChoices('parent_tab_id', 'parent_target_id')
 	)  # parent page that contains this popup or cross-origin iframe
 
+	# No info argument: pydantic-core then skips building a SerializationInfo for every dumped tab
 	@field_serializer('target_id')
-	def serialize_target_id(self, target_id: TargetID, _info: Any) -> str:
+	def serialize_target_id(self, target_id: TargetID) -> str:
 		return target_id[-4:]
 
 	@field_serializer('parent_target_id')
-	def serialize_parent_target_id(self, parent_target_id: TargetID | None, _info: Any) -> str | None:
+	def serialize_parent_target_id(self, parent_target_id: TargetID | None) -> str | None:
 		return parent_target_id[-4:] if parent_target_id else None
 
 
@@ -1107,7 +1107,8 @@ class DefaultActionWatchdog(BaseWatchdog):
 
 	def _is_non_ascii_char(self, char: str) -> bool:
 		"""Check if a character is non-ASCII (e.g. Cyrillic, CJK, Arabic, etc.)."""
-		return len(char) == 1 and ord(char) > 127
+		# str.isascii() reads CPython's precomputed ASCII flag on the string object, no per-byte scan
+		return len(char) == 1 and not char.isascii()
 
 	def _get_char_modifiers_and_vk(self, char: str) -> tuple[int, int, str]:
 		"""Get modifiers, virtual key code, and base key for a character.
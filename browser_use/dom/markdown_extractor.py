@@ -6,6 +6,7 @@ used by both the tools service and page actor.
 """
 
 import re
+import weakref
 from dataclasses import dataclass
 from enum import Enum, auto
 from typing import TYPE_CHECKING, Any
@@ -18,6 +19,12 @@ if TYPE_CHECKING:
 	from browser_use.browser.session import BrowserSession
 	from browser_use.browser.watchdogs.dom_watchdog import DOMWatchdog
 
+# Marker-free serializers are stateless, so extractions without a selector_map share these
+_SHARED_HTML_SERIALIZERS = {
+	False: HTMLSerializer(extract_links=False),
+	True: HTMLSerializer(extract_links=True),
+}
+
 
 async def extract_clean_markdown(
 	browser_session: 'BrowserSession | None' = None,
@@ -57,6 +64,15 @@ async def extract_clean_markdown(
 			raise ValueError('Cannot specify both browser_session and dom_service/target_id')
 		# Browser session path (tools service)
 		enhanced_dom_tree = await _get_enhanced_dom_tree_from_browser_session(browser_session)
+
+		# Extraction is pure with respect to the DOM tree, so reuse the result while the same tree
+		# object is current (a rebuilt tree is a new object; navigation also clears the cache).
+		# The entry holds only a weak reference so it never keeps a replaced tree alive.
+		cache_key = (extract_links, skip_json_filtering, include_interactive)
+		cached = browser_session._cached_markdown.get(cache_key)
+		if cached is not None and cached[0]() is enhanced_dom_tree:
+			return cached[1], dict(cached[2])
+
 		current_url = await browser_session.get_current_page_url()
 		method = 'enhanced_dom_tree'
 	elif dom_service is not None and target_id is not None:
@@ -79,11 +95,14 @@ async def extract_clean_markdown(
 		selector_map = serialized_state.selector_map
 		interactive_count = len(selector_map)
 
-	# Use the HTML serializer with the enhanced DOM tree
-	html_serializer = HTMLSerializer(extract_links=extract_links, selector_map=selector_map)
+	# Use the HTML serializer with the enhanced DOM tree (without markers it holds no per-call state)
+	if selector_map is None:
+		html_serializer = _SHARED_HTML_SERIALIZERS[bool(extract_links)]
+	else:
+		html_serializer = HTMLSerializer(extract_links=extract_links, selector_map=selector_map)
 
-	# Detect popups/modals before serialization
-	popups = html_serializer.detect_popups(enhanced_dom_tree)
+	# Serialize main content and detect popups/modals in a single walk
+	main_html, popups = html_serializer.serialize_without_popups(enhanced_dom_tree)
 	popup_count = len(popups)
 
 	# Use markdownify for clean markdown conversion
@@ -111,17 +130,15 @@ async def extract_clean_markdown(
 		for i, popup in enumerate(popups, 1):
 			popup_html = html_serializer.serialize(popup)
 			popup_md = html_to_markdown(popup_html)
-			popup_md = re.sub(r'%[0-9A-Fa-f]{2}', '', popup_md)  # Remove URL encoding
+			popup_md = _URL_ENCODING_RE.sub('', popup_md)  # Remove URL encoding
 			popup_md, _ = _preprocess_markdown_content(popup_md, skip_json_filtering=skip_json_filtering)
 			if popup_md.strip():
 				label = f'POPUP/MODAL {i}' if popup_count > 1 else 'POPUP/MODAL DETECTED'
 				popup_parts.append(f'--- {label} ---\n{popup_md.strip()}')
 
-		# Serialize main content excluding popups
-		exclude_ids = {id(p) for p in popups}
-		main_html = html_serializer.serialize_excluding(enhanced_dom_tree, exclude_ids)
+		# Main content was already serialized without the popups
 		main_md = html_to_markdown(main_html)
-		main_md = re.sub(r'%[0-9A-Fa-f]{2}', '', main_md)  # Remove URL encoding
+		main_md = _URL_ENCODING_RE.sub('', main_md)  # Remove URL encoding
 		main_md, chars_filtered = _preprocess_markdown_content(main_md, skip_json_filtering=skip_json_filtering)
 
 		# Combine: popups first, then main content
@@ -132,14 +149,13 @@ async def extract_clean_markdown(
 
 		original_html_length = len(main_html) + sum(len(html_serializer.serialize(p)) for p in popups)
 	else:
-		# No popups - use standard serialization
-		page_html = html_serializer.serialize(enhanced_dom_tree)
-		original_html_length = len(page_html)
+		# No popups - the main content is the whole page
+		original_html_length = len(main_html)
 
-		content = html_to_markdown(page_html)
+		content = html_to_markdown(main_html)
 
 		# Minimal cleanup - markdownify already does most of the work
-		content = re.sub(r'%[0-9A-Fa-f]{2}', '', content)  # Remove any remaining URL encoding
+		content = _URL_ENCODING_RE.sub('', content)  # Remove any remaining URL encoding
 
 		# Apply light preprocessing to clean up excessive whitespace
 		content, chars_filtered = _preprocess_markdown_content(content, skip_json_filtering=skip_json_filtering)
@@ -162,6 +178,10 @@ async def extract_clean_markdown(
 	if current_url:
 		stats['url'] = current_url
 
+	if browser_session is not None:
+		# Store a copy: callers annotate the returned stats with chunking details
+		browser_session._cached_markdown[cache_key] = (weakref.ref(enhanced_dom_tree), content, dict(stats))
+
 	return content, stats
 
 
@@ -187,13 +207,23 @@ async def _get_enhanced_dom_tree_from_browser_session(browser_session: 'BrowserS
 # Legacy aliases removed - all code now uses the unified extract_clean_markdown function
 
 
-def _preprocess_markdown_content(content: str, max_newlines: int = 3, skip_json_filtering: bool = False) -> tuple[str, int]:
+_URL_ENCODING_RE = re.compile(r'%[0-9A-Fa-f]{2}')
+
+# JSON noise patterns. Applied in this order: removing a backtick block can
+# join the text around it into a $type or nested blob that the later passes
+# then catch, so they must not be merged into a single alternation.
+_JSON_CODE_BLOCK_RE = re.compile(r'`\{["\w].*?\}`', re.DOTALL)
+_JSON_TYPE_RE = re.compile(r'\{"\$type":[^}]{100,}\}')
+_JSON_NESTED_RE = re.compile(r'\{"[^"]{5,}":\{[^}]{100,}\}')
+
+
+def _preprocess_markdown_content(content: str, skip_json_filtering: bool = False) -> tuple[str, int]:
 	"""
 	Light preprocessing of markdown output - minimal cleanup with JSON blob removal.
 
 	Args:
-	    content: Markdown content to lightly filter
-	    max_newlines: Maximum consecutive newlines to allow
+	    content: Markdown content to lightly filter. Blank lines are dropped, so the output never
+	        has more than one newline in a row.
 	    skip_json_filtering: If True, preserve JSON code blocks (useful for API documentation)
 
 	Returns:
@@ -206,14 +236,12 @@ def _preprocess_markdown_content(content: str, max_newlines: int = 3, skip_json_
 		# These are often embedded as `{"key":"value",...}` and can be massive
 		# Match JSON objects/arrays that are at least 100 chars long
 		# This catches SPA state/config data without removing small inline JSON
-		content = re.sub(r'`\{["\w].*?\}`', '', content, flags=re.DOTALL)  # Remove JSON in code blocks
-		content = re.sub(r'\{"\$type":[^}]{100,}\}', '', content)  # Remove JSON with $type fields (common pattern)
-		content = re.sub(r'\{"[^"]{5,}":\{[^}]{100,}\}', '', content)  # Remove nested JSON objects
-
-	# Compress consecutive newlines (4+ newlines become max_newlines)
-	content = re.sub(r'\n{4,}', '\n' * max_newlines, content)
+		content = _JSON_CODE_BLOCK_RE.sub('', content)  # Remove JSON in code blocks
+		content = _JSON_TYPE_RE.sub('', content)  # Remove JSON with $type fields (common pattern)
+		content = _JSON_NESTED_RE.sub('', content)  # Remove nested JSON objects
 
-	# Remove lines that are only whitespace
+	# Remove lines that are only whitespace. This also collapses every run of newlines to one,
+	# so no separate newline-compression pass is needed.
 	lines = content.split('\n')
 	filtered_lines = []
 	for line in lines:
@@ -58,7 +58,8 @@ class HTMLSerializer:
 	# Semantic popup/modal roles and attributes
 	_POPUP_ROLES = frozenset({'dialog', 'alertdialog'})
 
-	def _is_popup(self, node: EnhancedDOMTreeNode) -> bool:
+	@staticmethod
+	def _is_popup(node: EnhancedDOMTreeNode) -> bool:
 		"""Check if a node is a popup/modal element.
 
 		Detection is based on semantic HTML attributes:
@@ -75,71 +76,66 @@ class HTMLSerializer:
 		if node.node_type != NodeType.ELEMENT_NODE:
 			return False
 
-		tag_name = node.tag_name.lower() if node.tag_name else ''
-		attributes = node.attributes or {}
+		# Every popup signal is an attribute, so attribute-less nodes (most of the tree) exit here
+		attributes = node.attributes
+		if not attributes:
+			return False
 
 		# Check for <dialog open> element
-		if tag_name == 'dialog' and 'open' in attributes:
+		if 'open' in attributes and node.node_name.lower() == 'dialog':
 			return True
 
 		# Check for dialog/alertdialog role
-		role = attributes.get('role', '').lower()
-		if role in self._POPUP_ROLES:
+		role = attributes.get('role')
+		if role and role.lower() in HTMLSerializer._POPUP_ROLES:
 			return True
 
 		# Check for aria-modal="true"
-		aria_modal = attributes.get('aria-modal', '').lower()
-		if aria_modal == 'true':
-			return True
-
-		return False
-
-	def _detect_popups_recursive(self, node: EnhancedDOMTreeNode, popups: list[EnhancedDOMTreeNode]) -> None:
-		"""Recursively find all popup/modal elements in the DOM tree.
-
-		Args:
-			node: Current node to check
-			popups: List to append found popups to (modified in place)
-		"""
-		if self._is_popup(node):
-			popups.append(node)
-			# Don't recurse into popup children - the popup itself is what we want
-			return
-
-		# Check children
-		for child in node.children:
-			self._detect_popups_recursive(child, popups)
-
-		# Check shadow roots
-		if hasattr(node, 'shadow_roots') and node.shadow_roots:
-			for shadow_root in node.shadow_roots:
-				self._detect_popups_recursive(shadow_root, popups)
-
-		# Check content document (for iframes)
-		if hasattr(node, 'content_document') and node.content_document:
-			for child in node.content_document.children_nodes or []:
-				self._detect_popups_recursive(child, popups)
+		aria_modal = attributes.get('aria-modal')
+		return aria_modal is not None and aria_modal.lower() == 'true'
 
 	def detect_popups(self, root: EnhancedDOMTreeNode) -> list[EnhancedDOMTreeNode]:
 		"""Detect all popup/modal elements in the DOM tree.
 
-		This performs a pre-pass to find semantic popup elements before serialization.
 		Detection is based on:
 		- <dialog open> elements
 		- Elements with role="dialog" or role="alertdialog"
 		- Elements with aria-modal="true"
 
+		Runs the same walk as serialize_without_popups() so both always report the same popups.
+		Popups inside subtrees the serializer skips (e.g. <head>, <script>) are not reported.
+
 		Args:
 			root: Root node of the DOM tree
 
 		Returns:
-			List of popup/modal nodes found in the tree
+			List of popup/modal nodes found in the tree, in serialization order
 		"""
-		popups: list[EnhancedDOMTreeNode] = []
-		self._detect_popups_recursive(root, popups)
-		return popups
+		return self.serialize_without_popups(root)[1]
+
+	def serialize_without_popups(self, root: EnhancedDOMTreeNode) -> tuple[str, list[EnhancedDOMTreeNode]]:
+		"""Serialize the DOM tree with popups omitted, collecting the popups in the same walk.
+
+		This is the single traversal behind both detect_popups() and popup-aware markdown extraction.
+		Popups inside subtrees the serializer skips (e.g. <head>, <script>) are not reported.
+
+		Args:
+			root: Root node of the DOM tree
 
-	def serialize_excluding(self, node: EnhancedDOMTreeNode, exclude_nodes: set[int], depth: int = 0) -> str:
+		Returns:
+			Tuple of (HTML string without popups, list of popup nodes in serialization order)
+		"""
+		popups: list[EnhancedDOMTreeNode] = []
+		html = self.serialize_excluding(root, set(), popups=popups)
+		return html, popups
+
+	def serialize_excluding(
+		self,
+		node: EnhancedDOMTreeNode,
+		exclude_nodes: set[int],
+		depth: int = 0,
+		popups: list[EnhancedDOMTreeNode] | None = None,
+	) -> str:
 		"""Serialize DOM tree excluding specific nodes.
 
 		This is used to serialize the main page content while excluding popup/modal
@@ -149,22 +145,25 @@ class HTMLSerializer:
 			node: The DOM node to serialize
 			exclude_nodes: Set of node IDs (id(node)) to exclude from serialization
 			depth: Current depth for indentation (internal use)
+			popups: If provided, popup nodes are also excluded and appended to this list
 
 		Returns:
 			HTML string with excluded nodes omitted
 		"""
-		# Skip excluded nodes
-		if id(node) in exclude_nodes:
+		# Skip excluded nodes - the single exclusion check per node; an empty set skips the id() hash
+		if exclude_nodes and id(node) in exclude_nodes:
+			return ''
+		if popups is not None and self._is_popup(node):
+			popups.append(node)
 			return ''
 
 		# Use the same logic as serialize() but with exclusion check
 		if node.node_type == NodeType.DOCUMENT_NODE:
 			parts = []
 			for child in node.children_and_shadow_roots:
-				if id(child) not in exclude_nodes:
-					child_html = self.serialize_excluding(child, exclude_nodes, depth)
-					if child_html:
-						parts.append(child_html)
+				child_html = self.serialize_excluding(child, exclude_nodes, depth, popups)
+				if child_html:
+					parts.append(child_html)
 			return ''.join(parts)
 
 		elif node.node_type == NodeType.DOCUMENT_FRAGMENT_NODE:
@@ -172,10 +171,9 @@ class HTMLSerializer:
 			shadow_type = node.shadow_root_type or 'open'
 			parts.append(f'<template shadowroot="{shadow_type.lower()}">')
 			for child in node.children:
-				if id(child) not in exclude_nodes:
-					child_html = self.serialize_excluding(child, exclude_nodes, depth + 1)
-					if child_html:
-						parts.append(child_html)
+				child_html = self.serialize_excluding(child, exclude_nodes, depth + 1, popups)
+				if child_html:
+					parts.append(child_html)
 			parts.append('</template>')
 			return ''.join(parts)
 
@@ -239,30 +237,26 @@ class HTMLSerializer:
 			if tag_name == 'table':
 				if node.shadow_roots:
 					for shadow_root in node.shadow_roots:
-						if id(shadow_root) not in exclude_nodes:
-							child_html = self.serialize_excluding(shadow_root, exclude_nodes, depth + 1)
-							if child_html:
-								parts.append(child_html)
-				table_html = self._serialize_table_children_excluding(node, exclude_nodes, depth)
+						child_html = self.serialize_excluding(shadow_root, exclude_nodes, depth + 1, popups)
+						if child_html:
+							parts.append(child_html)
+				table_html = self._serialize_table_children_excluding(node, exclude_nodes, depth, popups)
 				parts.append(table_html)
 			elif tag_name in {'iframe', 'frame'} and node.content_document:
 				for child in node.content_document.children_nodes or []:
-					if id(child) not in exclude_nodes:
-						child_html = self.serialize_excluding(child, exclude_nodes, depth + 1)
-						if child_html:
-							parts.append(child_html)
+					child_html = self.serialize_excluding(child, exclude_nodes, depth + 1, popups)
+					if child_html:
+						parts.append(child_html)
 			else:
 				if node.shadow_roots:
 					for shadow_root in node.shadow_roots:
-						if id(shadow_root) not in exclude_nodes:
-							child_html = self.serialize_excluding(shadow_root, exclude_nodes, depth + 1)
-							if child_html:
-								parts.append(child_html)
-				for child in node.children:
-					if id(child) not in exclude_nodes:
-						child_html = self.serialize_excluding(child, exclude_nodes, depth + 1)
+						child_html = self.serialize_excluding(shadow_root, exclude_nodes, depth + 1, popups)
 						if child_html:
 							parts.append(child_html)
+				for child in node.children:
+					child_html = self.serialize_excluding(child, exclude_nodes, depth + 1, popups)
+					if child_html:
+						parts.append(child_html)
 
 			parts.append(f'</{tag_name}>')
 			marker = self._get_interactive_marker(node)
@@ -281,12 +275,18 @@ class HTMLSerializer:
 		else:
 			return ''
 
-	def _serialize_table_children_excluding(self, table_node: EnhancedDOMTreeNode, exclude_nodes: set[int], depth: int) -> str:
+	def _serialize_table_children_excluding(
+		self,
+		table_node: EnhancedDOMTreeNode,
+		exclude_nodes: set[int],
+		depth: int,
+		popups: list[EnhancedDOMTreeNode] | None = None,
+	) -> str:
 		"""Serialize table children with exclusion support.
 
 		Same logic as _serialize_table_children but respects exclude_nodes.
 		"""
-		children = [c for c in table_node.children if id(c) not in exclude_nodes]
+		children = [c for c in table_node.children if id(c) not in exclude_nodes] if exclude_nodes else table_node.children
 		if not children:
 			return ''
 
@@ -297,7 +297,7 @@ class HTMLSerializer:
 		if has_thead or not child_tags:
 			parts = []
 			for child in children:
-				child_html = self.serialize_excluding(child, exclude_nodes, depth + 1)
+				child_html = self.serialize_excluding(child, exclude_nodes, depth + 1, popups)
 				if child_html:
 					parts.append(child_html)
 			return ''.join(parts)
@@ -315,32 +315,32 @@ class HTMLSerializer:
 		if first_tr is None:
 			parts = []
 			for child in children:
-				child_html = self.serialize_excluding(child, exclude_nodes, depth + 1)
+				child_html = self.serialize_excluding(child, exclude_nodes, depth + 1, popups)
 				if child_html:
 					parts.append(child_html)
 			return ''.join(parts)
 
 		parts = []
 		for child in children[:first_tr_idx]:
-			child_html = self.serialize_excluding(child, exclude_nodes, depth + 1)
+			child_html = self.serialize_excluding(child, exclude_nodes, depth + 1, popups)
 			if child_html:
 				parts.append(child_html)
 
 		parts.append('<thead>')
-		parts.append(self.serialize_excluding(first_tr, exclude_nodes, depth + 2))
+		parts.append(self.serialize_excluding(first_tr, exclude_nodes, depth + 2, popups))
 		parts.append('</thead>')
 
 		remaining = children[first_tr_idx + 1 :]
 		if remaining and not has_tbody:
 			parts.append('<tbody>')
 			for child in remaining:
-				child_html = self.serialize_excluding(child, exclude_nodes, depth + 2)
+				child_html = self.serialize_excluding(child, exclude_nodes, depth + 2, popups)
 				if child_html:
 					parts.append(child_html)
 			parts.append('</tbody>')
 		else:
 			for child in remaining:
-				child_html = self.serialize_excluding(child, exclude_nodes, depth + 1)
+				child_html = self.serialize_excluding(child, exclude_nodes, depth + 1, popups)
 				if child_html:
 					parts.append(child_html)
 
@@ -369,7 +369,7 @@ class EnhancedSnapshotNode:
 # 	element_index: int | None
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, weakref_slot=True)
 class EnhancedDOMTreeNode:
 	"""
 	Enhanced DOM tree node that contains information from AX, DOM, and Snapshot trees. It's mostly based on the types on DOM node type with enhanced data from AX and Snapshot trees.
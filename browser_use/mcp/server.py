@@ -40,6 +40,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+from pydantic import TypeAdapter, create_model
+
 # Configure logging for MCP mode - redirect to stderr but preserve critical diagnostics
 logging.basicConfig(
 	stream=sys.stderr, level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', force=True
@@ -93,12 +95,25 @@ logging.disable(logging.CRITICAL)
 # Import browser_use modules
 from browser_use import ActionModel, PatternLearningAgent
 from browser_use.browser import BrowserProfile, BrowserSession
+from browser_use.browser.events import (
+	ClickElementEvent,
+	CloseTabEvent,
+	GoBackEvent,
+	NavigateToUrlEvent,
+	ScrollEvent,
+	ScrollToTextEvent,
+	SendKeysEvent,
+	SwitchTabEvent,
+	TypeTextEvent,
+)
+from browser_use.browser.views import TabInfo
 from browser_use.config import get_default_llm, get_default_profile, load_browser_use_config
 from browser_use.filesystem.file_system import FileSystem
 from browser_use.llm.anthropic.chat import ChatAnthropic
 from browser_use.llm.google.chat import ChatGoogle
 from browser_use.llm.openai.chat import ChatOpenAI
 from browser_use.tools.service import Tools
+from browser_use.tools.utils import get_click_description
 
 logger = logging.getLogger(__name__)
 
@@ -182,8 +197,26 @@ def get_parent_process_cmdline() -> str | None:
 		return None
 
 
+# Screenshots larger than this (base64 chars) make browser_get_state return compact JSON
+_COMPACT_STATE_THRESHOLD = 1_000_000
+
+_LAZY_LOAD_NOTE = '[Note: {pixels_below}px of page content below current scroll position. Use browser_scroll to load more.]'
+
+# Element attributes reported by browser_get_state for identification
+_STATE_ELEMENT_ATTRS = ('placeholder', 'href', 'aria-label', 'role', 'type', 'name', 'data-testid')
+
+# Serializes the tab list in one call (tab_id aliases applied) instead of a model_dump() per tab
+_TABINFO_LIST_ADAPTER = TypeAdapter(list[TabInfo])
+
+# Action model matching the tools' `extract` action, built once instead of per extraction call
+_ExtractAction = create_model(
+	'ExtractAction',
+	__base__=ActionModel,
+	extract=dict[str, Any],
+)
+
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class SessionState:
 	"""Encapsulates per-session state for multi-session MCP server."""
 	session_id: str
@@ -195,6 +228,41 @@ class SessionState:
 	last_activity: float
 
 
+@dataclass(slots=True, frozen=True, kw_only=True)
+class AgentLLMSettings:
+	"""LLM settings for retry_with_browser_use_agent (config > env), resolved once per server."""
+
+	model_provider: str
+	model: str | None
+	patterns_path: str | None
+	region: str
+	anthropic_api_key: str | None
+	google_vertexai: Any
+	google_project: str | None
+	google_location: str | None
+	google_api_key: str | None
+	openai_api_key: str
+	openai_base_url: str | None
+	openai_provider: str
+
+	@classmethod
+	def from_config(cls, llm_config: dict[str, Any]) -> 'AgentLLMSettings':
+		return cls(
+			model_provider=llm_config.get('model_provider') or os.getenv('MODEL_PROVIDER') or '',
+			model=llm_config.get('model') or os.getenv('BROWSER_USE_AGENT_MODEL'),
+			patterns_path=llm_config.get('patterns_path') or os.getenv('BROWSER_USE_PATTERNS_PATH') or None,
+			region=llm_config.get('region') or os.getenv('REGION') or 'us-east-1',
+			anthropic_api_key=llm_config.get('api_key') or os.getenv('ANTHROPIC_API_KEY'),
+			google_vertexai=llm_config.get('vertexai') or os.getenv('GOOGLE_VERTEXAI'),
+			google_project=llm_config.get('project') or os.getenv('GOOGLE_CLOUD_PROJECT'),
+			google_location=llm_config.get('location') or os.getenv('GOOGLE_CLOUD_LOCATION'),
+			google_api_key=llm_config.get('api_key') or os.getenv('GOOGLE_API_KEY'),
+			openai_api_key=llm_config.get('api_key') or os.getenv('OPENAI_API_KEY') or 'not-needed',
+			openai_base_url=llm_config.get('base_url') or os.getenv('OPENAI_PROXY_BASE_URL'),
+			openai_provider=llm_config.get('provider') or os.getenv('BROWSER_USE_LLM_PROVIDER') or '',
+		)
+
+
 class BrowserUseServer:
 	"""MCP Server for browser-use capabilities."""
 
@@ -206,8 +274,10 @@ class BrowserUseServer:
 		self.config = load_browser_use_config()
 		self.browser_session: BrowserSession | None = None
 		self.tools: Tools | None = None
+		# LLM section of the config, resolved once and reused by every agent run
+		self._llm_config: dict[str, Any] = get_default_llm(self.config)
 		# LLM for page content extraction (browser_extract_content)
-		llm_config = get_default_llm(self.config)
+		llm_config = self._llm_config
 		base_url = llm_config.get('base_url') or os.getenv('OPENAI_PROXY_BASE_URL') or 'http://localhost:8080/v1'
 		provider = llm_config.get('provider') or os.getenv('BROWSER_USE_LLM_PROVIDER') or ''
 		if provider:
@@ -224,6 +294,8 @@ class BrowserUseServer:
 			base_url=proxy_base_url,
 			temperature=0.0,
 		)
+		# Agent LLM settings for retry_with_browser_use_agent, resolved once so provider and keys stay consistent
+		self._agent_llm_settings = AgentLLMSettings.from_config(llm_config)
 		self.file_system: FileSystem | None = None
 		self._telemetry = ProductTelemetry()
 		self._start_time = time.time()
@@ -919,28 +991,26 @@ class BrowserUseServer:
 		"""Run an autonomous agent task with pattern learning, reusing the current browser session."""
 		logger.debug(f'Running agent task: {task}')
 
-		# Get LLM config
-		llm_config = get_default_llm(self.config)
+		llm_config = self._llm_config
+		settings = self._agent_llm_settings
 
 		# Get LLM provider - priority: config > env > auto-detect from model name
-		model_provider = llm_config.get('model_provider') or os.getenv('MODEL_PROVIDER') or ''
+		model_provider = settings.model_provider
 
 		# Model priority: explicit parameter > config > env
 		# No hardcoded fallback - let the provider selection logic handle defaults
-		config_model = llm_config.get('model') or os.getenv('BROWSER_USE_AGENT_MODEL')
-		llm_model = model or config_model
+		llm_model = model or settings.model
 
 		if model_provider.lower() == 'bedrock':
 			llm_model = llm_model or 'us.anthropic.claude-sonnet-4-20250514-v1:0'
-			aws_region = llm_config.get('region') or os.getenv('REGION') or 'us-east-1'
 			llm = ChatAWSBedrock(
 				model=llm_model,
-				aws_region=aws_region,
+				aws_region=settings.region,
 				aws_sso_auth=True,
 			)
 		elif model_provider.lower() in ('anthropic', 'claude') or (llm_model and llm_model.startswith('claude')):
 			# Anthropic
-			api_key = llm_config.get('api_key') or os.getenv('ANTHROPIC_API_KEY')
+			api_key = settings.anthropic_api_key
 			if not api_key:
 				return 'Error: ANTHROPIC_API_KEY not set in config or environment'
 			llm = ChatAnthropic(
@@ -951,13 +1021,13 @@ class BrowserUseServer:
 		elif model_provider.lower() in ('google', 'vertex') or (llm_model and llm_model.startswith('gemini')):
 			# Google / Vertex AI
 			google_kwargs: dict[str, Any] = {}
-			if vertexai_flag := llm_config.get('vertexai') or os.getenv('GOOGLE_VERTEXAI'):
+			if vertexai_flag := settings.google_vertexai:
 				google_kwargs['vertexai'] = vertexai_flag in (True, 'true', '1', 'True')
-			if project := llm_config.get('project') or os.getenv('GOOGLE_CLOUD_PROJECT'):
+			if project := settings.google_project:
 				google_kwargs['project'] = project
-			if location := llm_config.get('location') or os.getenv('GOOGLE_CLOUD_LOCATION'):
+			if location := settings.google_location:
 				google_kwargs['location'] = location
-			if api_key := llm_config.get('api_key') or os.getenv('GOOGLE_API_KEY'):
+			if api_key := settings.google_api_key:
 				google_kwargs['api_key'] = api_key
 			llm = ChatGoogle(
 				model=llm_model or 'gemini-2.5-flash',
@@ -966,9 +1036,8 @@ class BrowserUseServer:
 			)
 		else:
 			# OpenAI-compatible fallback (includes opencode-openai-proxy)
-			api_key = llm_config.get('api_key') or os.getenv('OPENAI_API_KEY') or 'not-needed'
-			base_url = llm_config.get('base_url') or os.getenv('OPENAI_PROXY_BASE_URL')
-			provider = llm_config.get('provider') or os.getenv('BROWSER_USE_LLM_PROVIDER') or ''
+			base_url = settings.openai_base_url
+			provider = settings.openai_provider
 			openai_kwargs: dict[str, Any] = {}
 			if base_url:
 				if provider:
@@ -977,7 +1046,7 @@ class BrowserUseServer:
 					openai_kwargs['base_url'] = base_url
 			llm = ChatOpenAI(
 				model=llm_model or 'gpt-4.1',
-				api_key=api_key,
+				api_key=settings.openai_api_key,
 				temperature=llm_config.get('temperature', 0.7),
 				**openai_kwargs,
 			)
@@ -985,8 +1054,7 @@ class BrowserUseServer:
 		# Ensure browser session and tools are fully initialized (handles partial init)
 		await self._init_browser_session(allowed_domains=allowed_domains)
 
-		# Resolve patterns path from config or default
-		patterns_path = llm_config.get('patterns_path') or os.getenv('BROWSER_USE_PATTERNS_PATH') or None
+		patterns_path = settings.patterns_path
 
 		# Create agent with pattern learning, reusing the existing browser session
 		agent = PatternLearningAgent(
@@ -1053,8 +1121,6 @@ class BrowserUseServer:
 		if session:
 			session.last_activity = time.time()
 
-		from browser_use.browser.events import NavigateToUrlEvent
-
 		try:
 			event = bs.event_bus.dispatch(NavigateToUrlEvent(url=url, new_tab=new_tab))
 			await event
@@ -1115,13 +1181,8 @@ class BrowserUseServer:
 			return f'Element with index {index} not found'
 
 		# Get element description for response
-		from browser_use.tools.utils import get_click_description
-
 		element_desc = get_click_description(element)
 
-		# Capture tabs before click for new tab detection
-		tabs_before = {t.target_id for t in await bs.get_tabs()}
-
 		if new_tab:
 			# For links, extract href and open in new tab
 			href = element.attributes.get('href')
@@ -1139,34 +1200,23 @@ class BrowserUseServer:
 					full_url = href
 
 				# Open link in new tab
-				from browser_use.browser.events import NavigateToUrlEvent
-
 				event = bs.event_bus.dispatch(NavigateToUrlEvent(url=full_url, new_tab=True))
 				await event
 				await event.event_result(raise_if_any=True, raise_if_none=False)
 				return f'Clicked {element_desc} (index {index}) | Opened in new tab: {full_url[:50]}...'
-			else:
-				# For non-link elements, just do a normal click
-				from browser_use.browser.events import ClickElementEvent
 
-				event = bs.event_bus.dispatch(ClickElementEvent(node=element))
-				await event
-				click_metadata = await event.event_result(raise_if_any=True, raise_if_none=False)
-				return await self._build_click_response(
-					element_desc, index, click_metadata, tabs_before, session,
-					'(new tab not supported for non-link elements)'
-				)
-		else:
-			# Normal click
-			from browser_use.browser.events import ClickElementEvent
+		# Capture tabs before click for new tab detection (only clicks need it, not the link path above)
+		tabs_before = frozenset(t.target_id for t in await bs.get_tabs())
 
-			event = bs.event_bus.dispatch(ClickElementEvent(node=element))
-			await event
-			click_metadata = await event.event_result(raise_if_any=True, raise_if_none=False)
-			return await self._build_click_response(element_desc, index, click_metadata, tabs_before, session)
+		# Normal click (new_tab on a non-link element falls back to this too)
+		event = bs.event_bus.dispatch(ClickElementEvent(node=element))
+		await event
+		click_metadata = await event.event_result(raise_if_any=True, raise_if_none=False)
+		suffix = '(new tab not supported for non-link elements)' if new_tab else ''
+		return await self._build_click_response(element_desc, index, click_metadata, tabs_before, session, suffix)
 
 	async def _build_click_response(
-		self, element_desc: str, index: int, click_metadata: dict | None, tabs_before: set, session: SessionState, suffix: str = ''
+		self, element_desc: str, index: int, click_metadata: dict | None, tabs_before: frozenset[str], session: SessionState, suffix: str = ''
 	) -> str:
 		"""Build enriched click response with metadata and new tab detection."""
 		parts = [f'Clicked {element_desc} (index {index})']
@@ -1177,23 +1227,19 @@ class BrowserUseServer:
 		# Check for validation errors and download info from metadata
 		if isinstance(click_metadata, dict):
 			if click_metadata.get('validation_error'):
+				# The click was refused before reaching the page, so it cannot have opened a tab
 				parts.append(f"Warning: {click_metadata['validation_error']}")
+				return ' | '.join(parts)
 			if click_metadata.get('download'):
 				dl = click_metadata['download']
 				parts.append(f"Downloaded: {dl.get('file_name', 'unknown')} ({dl.get('file_size', 0)} bytes)")
 			if click_metadata.get('pdf_generated'):
 				parts.append(f"Generated PDF: {click_metadata.get('path', '')}")
 
-		# Detect new tabs opened
-		tabs_after = {t.target_id for t in await session.browser_session.get_tabs()}
-		new_tabs = tabs_after - tabs_before
-		if new_tabs:
-			for tid in new_tabs:
-				tabs = await session.browser_session.get_tabs()
-				for t in tabs:
-					if t.target_id == tid:
-						parts.append(f"Opened new tab: {t.url}")
-						break
+		# Detect new tabs opened (single pass over the current tabs, no per-tab re-fetch)
+		for t in await session.browser_session.get_tabs():
+			if t.target_id not in tabs_before:
+				parts.append(f"Opened new tab: {t.url}")
 
 		return ' | '.join(parts)
 
@@ -1203,8 +1249,6 @@ class BrowserUseServer:
 		if not element:
 			return f'Element with index {index} not found'
 
-		from browser_use.browser.events import TypeTextEvent
-
 		# Conservative heuristic to detect potentially sensitive data
 		# Only flag very obvious patterns to minimize false positives
 		is_potentially_sensitive = len(text) >= 6 and (
@@ -1269,19 +1313,15 @@ class BrowserUseServer:
 		result = {
 			'url': state.url,
 			'title': state.title,
-			'tabs': [tab.model_dump(by_alias=True) for tab in state.tabs],
+			'tabs': _TABINFO_LIST_ADAPTER.dump_python(state.tabs, by_alias=True),
 			'interactive_elements': [],
 		}
 
 		# Add interactive elements with their indices
+		interactive_elements = result['interactive_elements']
 		for index, element in state.dom_state.selector_map.items():
+			attributes = element.attributes
 			text = element.get_all_children_text(max_depth=2)[:100].strip()
-			elem_info = {
-				'index': index,
-				'tag': element.tag_name,
-			}
-			if text:
-				elem_info['text'] = text
 
 			# Filter out JavaScript/JSON code that appears as element text content.
 			# Complex sites (e.g. Yandex Market) inject widget configs into DOM elements,
@@ -1298,25 +1338,34 @@ class BrowserUseServer:
 				if _is_code:
 					# Clear text but keep element if it has other identity (attributes)
 					text = ''
-					elem_info.pop('text', None)
 
-			# Include useful attributes for element identification
-			for attr in ('placeholder', 'href', 'aria-label', 'role', 'type', 'name', 'data-testid'):
-				val = element.attributes.get(attr)
+			elem_info: dict[str, Any] = {
+				'index': index,
+				'tag': element.tag_name,
+			}
+			if text:
+				elem_info['text'] = text
+
+			# Include useful attributes for element identification (each looked up once)
+			found_attr = False
+			for attr in _STATE_ELEMENT_ATTRS:
+				val = attributes.get(attr)
 				if val:
 					elem_info[attr] = val[:80] if isinstance(val, str) else val
+					found_attr = True
 
 			# Skip elements with no identifying information (no text, no key attributes)
-			has_identity = text or any(
-				element.attributes.get(a) for a in ('placeholder', 'href', 'aria-label', 'role', 'type', 'name', 'data-testid', 'id', 'value')
-			)
+			has_identity = bool(text) or found_attr or attributes.get('id') or attributes.get('value')
 			if not has_identity:
 				continue
 
-			result['interactive_elements'].append(elem_info)
+			interactive_elements.append(elem_info)
 
 		if include_screenshot and state.screenshot:
 			result['screenshot'] = state.screenshot
+			# Indentation adds nothing for a base64 blob and would inflate an already multi-MB payload
+			if len(state.screenshot) > _COMPACT_STATE_THRESHOLD:
+				return json.dumps(result, separators=(',', ':'))
 
 		return json.dumps(result, indent=2)
 
@@ -1357,7 +1406,6 @@ class BrowserUseServer:
 
 		# If force_full_page, scroll through entire page to trigger lazy loading
 		if force_full_page:
-			from browser_use.browser.events import ScrollEvent
 			try:
 				prev_pixels_below = float('inf')
 				stale_count = 0
@@ -1399,17 +1447,6 @@ class BrowserUseServer:
 
 		state = await bs.get_browser_state_summary()
 
-		# Use the extract action
-		# Create a dynamic action model that matches the tools's expectations
-		from pydantic import create_model
-
-		# Create action model dynamically
-		ExtractAction = create_model(
-			'ExtractAction',
-			__base__=ActionModel,
-			extract=dict[str, Any],
-		)
-
 		# Build extract params
 		extract_params: dict[str, Any] = {
 			'query': query,
@@ -1421,7 +1458,7 @@ class BrowserUseServer:
 			extract_params['output_schema'] = output_schema
 
 		# Use model_validate because Pyright does not understand the dynamic model
-		action = ExtractAction.model_validate({'extract': extract_params})
+		action = _ExtractAction.model_validate({'extract': extract_params})
 		action_result = await tools.act(
 			action=action,
 			browser_session=bs,
@@ -1429,19 +1466,16 @@ class BrowserUseServer:
 			file_system=fs,
 		)
 
-		content = action_result.extracted_content or 'No content extracted'
+		parts = [action_result.extracted_content or 'No content extracted']
 
 		# Add lazy loading hint if more content exists below current scroll position
 		try:
 			if state.page_info and state.page_info.pixels_below > 500:
-				content += (
-					f'\n\n[Note: {state.page_info.pixels_below}px of page content below current scroll position. '
-					f'Use browser_scroll to load more.]'
-				)
+				parts.append(_LAZY_LOAD_NOTE.format(pixels_below=state.page_info.pixels_below))
 		except Exception:
 			pass  # Don't fail extraction over a hint
 
-		return content
+		return '\n\n'.join(parts)
 
 	async def _scroll(self, direction: str = 'down', pages: float | None = None, element_index: int | None = None, session: SessionState | None = None) -> str:
 		"""Scroll page or element with position feedback."""
@@ -1452,8 +1486,6 @@ class BrowserUseServer:
 		if session:
 			session.last_activity = time.time()
 
-		from browser_use.browser.events import ScrollEvent
-
 		# Determine scroll amount in pixels
 		if pages is not None:
 			# Get viewport height via CDP for accurate page-based scrolling
@@ -1539,8 +1571,6 @@ class BrowserUseServer:
 
 	async def _go_back(self, session: SessionState) -> str:
 		"""Go back in browser history."""
-		from browser_use.browser.events import GoBackEvent
-
 		event = session.browser_session.event_bus.dispatch(GoBackEvent())
 		await event
 		return 'Navigated back'
@@ -1549,8 +1579,6 @@ class BrowserUseServer:
 		"""Find text on page and scroll to it."""
 		session.last_activity = time.time()
 
-		from browser_use.browser.events import ScrollToTextEvent
-
 		try:
 			event = session.browser_session.event_bus.dispatch(ScrollToTextEvent(text=text))
 			await event.event_result(raise_if_any=True, raise_if_none=False)
@@ -1562,8 +1590,6 @@ class BrowserUseServer:
 		"""Send keyboard keys or shortcuts."""
 		session.last_activity = time.time()
 
-		from browser_use.browser.events import SendKeysEvent
-
 		try:
 			event = session.browser_session.event_bus.dispatch(SendKeysEvent(keys=keys))
 			await event
@@ -1604,6 +1630,9 @@ class BrowserUseServer:
 
 			if result_type == 'undefined':
 				return 'JavaScript executed (no return value)'
+			elif result_type == 'string' and isinstance(value, str):
+				# Most common case (document.title, textContent, ...) - already a str, nothing to encode
+				return value
 			elif value is None:
 				return 'null'
 			elif isinstance(value, (dict, list)):
@@ -1626,18 +1655,16 @@ class BrowserUseServer:
 
 	async def _switch_tab(self, tab_id: str, session: SessionState) -> str:
 		"""Switch to a different tab."""
-		from browser_use.browser.events import SwitchTabEvent
-
 		target_id = await session.browser_session.get_target_id_from_tab_id(tab_id)
 		event = session.browser_session.event_bus.dispatch(SwitchTabEvent(target_id=target_id))
 		await event
+		# Rebuild the browser state so the selector map matches the new tab; index-based
+		# actions that follow the switch would otherwise resolve against the old tab's elements
 		state = await session.browser_session.get_browser_state_summary()
 		return f'Switched to tab {tab_id}: {state.url}'
 
 	async def _close_tab(self, tab_id: str, session: SessionState) -> str:
 		"""Close a specific tab."""
-		from browser_use.browser.events import CloseTabEvent
-
 		target_id = await session.browser_session.get_target_id_from_tab_id(tab_id)
 		event = session.browser_session.event_bus.dispatch(CloseTabEvent(target_id=target_id))
 		await event
@@ -1747,6 +1774,10 @@ class BrowserUseServer:
 		if not self.sessions:
 			return 'No active browser sessions'
 
+		return json.dumps(self._list_sessions_data(), indent=2)
+
+	def _list_sessions_data(self) -> list[dict[str, Any]]:
+		"""Build the per-session info that _list_sessions serializes."""
 		sessions_info = []
 		for session_id, session_state in self.sessions.items():
 			bs = session_state.browser_session
@@ -1767,7 +1798,7 @@ class BrowserUseServer:
 				}
 			)
 
-		return json.dumps(sessions_info, indent=2)
+		return sessions_info
 
 	async def _close_session(self, session_id: str | None = None) -> str:
 		"""Close a browser session by ID. Without ID, list active sessions."""
@@ -14,18 +14,28 @@ Covers:
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from bubus import EventBus
 
 from browser_use.actor.utils import get_key_info
 from browser_use.browser.watchdogs.default_action_watchdog import DefaultActionWatchdog
 
+ASCII_LETTERS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+ASCII_DIGITS = '0123456789'
+ASCII_SPECIAL = '!@#$%^&*()_+-=[]{}|;:\'",.<>?/`~ \t\n'
+CYRILLIC_LOWER = 'абвгдежзийклмнопрстуфхцчшщъыьэюя'
+CYRILLIC_UPPER = 'АБВГДЕЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ'
+CJK = '你好世界'
+ARABIC = 'مرحبا'
 
-@pytest.fixture
+
+@pytest.fixture(scope='module')
 def watchdog():
-	"""Create a DefaultActionWatchdog with minimal mocked dependencies."""
+	"""Create a DefaultActionWatchdog with minimal mocked dependencies.
+
+	Module-scoped: the key-code helpers under test are pure and never mutate the watchdog.
+	"""
 	mock_session = MagicMock()
 	mock_session.logger = MagicMock()
-	mock_event_bus = MagicMock(spec=EventBus)
+	mock_event_bus = MagicMock()
 	mock_event_bus.handlers = {}
 
 	# Use model_construct to bypass Pydantic validation for unit testing
@@ -39,33 +49,13 @@ def watchdog():
 class TestIsNonAsciiChar:
 	"""Tests for _is_non_ascii_char helper."""
 
-	def test_ascii_letters_are_not_non_ascii(self, watchdog):
-		for char in 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ':
-			assert watchdog._is_non_ascii_char(char) is False, f'ASCII letter {char!r} should not be non-ASCII'
-
-	def test_ascii_digits_are_not_non_ascii(self, watchdog):
-		for char in '0123456789':
-			assert watchdog._is_non_ascii_char(char) is False
-
-	def test_ascii_special_chars_are_not_non_ascii(self, watchdog):
-		for char in '!@#$%^&*()_+-=[]{}|;:\'",.<>?/`~ \t\n':
-			assert watchdog._is_non_ascii_char(char) is False, f'ASCII special char {char!r} should not be non-ASCII'
-
-	def test_cyrillic_lowercase_is_non_ascii(self, watchdog):
-		for char in 'абвгдежзийклмнопрстуфхцчшщъыьэюя':
-			assert watchdog._is_non_ascii_char(char) is True, f'Cyrillic {char!r} should be non-ASCII'
-
-	def test_cyrillic_uppercase_is_non_ascii(self, watchdog):
-		for char in 'АБВГДЕЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ':
-			assert watchdog._is_non_ascii_char(char) is True, f'Cyrillic {char!r} should be non-ASCII'
-
-	def test_cjk_characters_are_non_ascii(self, watchdog):
-		for char in '你好世界':
-			assert watchdog._is_non_ascii_char(char) is True, f'CJK {char!r} should be non-ASCII'
+	@pytest.mark.parametrize('char', tuple(ASCII_LETTERS + ASCII_DIGITS + ASCII_SPECIAL))
+	def test_ascii_char_is_not_non_ascii(self, watchdog, char):
+		assert watchdog._is_non_ascii_char(char) is False, f'ASCII char {char!r} should not be non-ASCII'
 
-	def test_arabic_characters_are_non_ascii(self, watchdog):
-		for char in 'مرحبا':
-			assert watchdog._is_non_ascii_char(char) is True, f'Arabic {char!r} should be non-ASCII'
+	@pytest.mark.parametrize('char', tuple(CYRILLIC_LOWER + CYRILLIC_UPPER + CJK + ARABIC))
+	def test_non_ascii_char_is_non_ascii(self, watchdog, char):
+		assert watchdog._is_non_ascii_char(char) is True, f'{char!r} should be non-ASCII'
 
 	def test_single_codepoint_emoji_is_non_ascii(self, watchdog):
 		# Single codepoint emoji (U+1F44D): len == 1 in Python 3, ord > 127
@@ -8,20 +8,40 @@ Tests cover:
 - E1: force_full_page has stale scroll detection and reduced iterations
 """
 
+import functools
 import pytest
 import inspect
 import ast
+import re
 import textwrap
 
 from browser_use.mcp.server import BrowserUseServer
 
 
+@functools.lru_cache(maxsize=None)
+def _src(fn) -> str:
+    """Source of a server method, read once per test session."""
+    return inspect.getsource(fn)
+
+
+@functools.lru_cache(maxsize=None)
+def _tree(fn) -> ast.Module:
+    """Parsed AST of a server method, built once per test session."""
+    return ast.parse(textwrap.dedent(_src(fn)))
+
+
+# Body of the force_full_page scroll loop: from `for ... in range(...)` up to the scroll-back step
+_FORCE_FULL_PAGE_LOOP_RE = re.compile(
+    r'force_full_page.*?for\s+\w+\s+in\s+range\([^)]+\):(?P<loop>.*?)Scroll back', re.DOTALL
+)
+
+
 class TestCloseTabFocusRecovery:
     """A6: close_tab should wait for focus RECOVERY (new tab), not just CLEARING (None)."""
 
     def test_close_tab_waits_for_non_none_focus(self):
         """The retry loop must check that focus is set to a DIFFERENT valid target, not just cleared."""
-        source = inspect.getsource(BrowserUseServer._close_tab)
+        source = _src(BrowserUseServer._close_tab)
 
         # The fix: condition should be `focus is not None and focus != target_id`
         # Old broken condition was: `agent_focus_target_id != target_id` (True when None)
@@ -32,10 +52,8 @@ class TestCloseTabFocusRecovery:
 
     def test_close_tab_retry_count_increased(self):
         """Retry count should be > 5 to allow time for async focus recovery."""
-        source = inspect.getsource(BrowserUseServer._close_tab)
-
         # Find range(N) in the retry loop
-        tree = ast.parse(textwrap.dedent(source))
+        tree = _tree(BrowserUseServer._close_tab)
         for node in ast.walk(tree):
             if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'range':
                 if node.args and isinstance(node.args[0], ast.Constant):
@@ -53,7 +71,7 @@ class TestGetStateJSFilter:
 
     def test_get_browser_state_has_code_filter(self):
         """_get_browser_state must contain JS/JSON text filtering logic."""
-        source = inspect.getsource(BrowserUseServer._get_browser_state)
+        source = _src(BrowserUseServer._get_browser_state)
 
         # The filter should detect JSON objects and JS code patterns
         assert 'startswith' in source, (
@@ -137,21 +155,21 @@ class TestFindAndClickPlaceholder:
 
     def test_find_and_click_js_checks_placeholder(self):
         """The JS in _find_and_click text branch must check el.placeholder."""
-        source = inspect.getsource(BrowserUseServer._find_and_click)
+        source = _src(BrowserUseServer._find_and_click)
         assert 'placeholder' in source, (
             '_find_and_click must check placeholder attribute for text matching'
         )
 
     def test_find_and_click_js_checks_aria_label(self):
         """The JS in _find_and_click text branch must check aria-label."""
-        source = inspect.getsource(BrowserUseServer._find_and_click)
+        source = _src(BrowserUseServer._find_and_click)
         assert 'aria-label' in source, (
             '_find_and_click must check aria-label attribute for text matching'
         )
 
     def test_find_and_click_js_checks_title(self):
         """The JS in _find_and_click text branch must check title attribute."""
-        source = inspect.getsource(BrowserUseServer._find_and_click)
+        source = _src(BrowserUseServer._find_and_click)
         # title is used in the haystack join
         assert '.title' in source, (
             '_find_and_click must check title attribute for text matching'
@@ -159,7 +177,7 @@ class TestFindAndClickPlaceholder:
 
     def test_find_and_click_selector_includes_input_types(self):
         """The clickable selector should include input[type=search] and input[type=text]."""
-        source = inspect.getsource(BrowserUseServer._find_and_click)
+        source = _src(BrowserUseServer._find_and_click)
         assert 'input[type=search]' in source, (
             '_find_and_click clickable selector must include input[type=search]'
         )
@@ -169,7 +187,7 @@ class TestFindAndClickPlaceholder:
 
     def test_find_and_click_text_response_uses_fallback(self):
         """When textContent is empty, response text should fall back to placeholder/aria-label."""
-        source = inspect.getsource(BrowserUseServer._find_and_click)
+        source = _src(BrowserUseServer._find_and_click)
         # The text field in return should have fallback chain
         assert 'el.placeholder' in source, (
             '_find_and_click return text should fall back to placeholder when textContent is empty'
@@ -181,21 +199,21 @@ class TestScrollHeavyDOMFallback:
 
     def test_scroll_has_timeout_on_get_browser_state(self):
         """_scroll must wrap get_browser_state_summary in asyncio.wait_for with timeout."""
-        source = inspect.getsource(BrowserUseServer._scroll)
+        source = _src(BrowserUseServer._scroll)
         assert 'wait_for' in source, (
             '_scroll must use asyncio.wait_for to timeout get_browser_state_summary on heavy DOM'
         )
 
     def test_scroll_has_lightweight_js_fallback(self):
         """_scroll must fall back to lightweight JS when DOM reindex fails/times out."""
-        source = inspect.getsource(BrowserUseServer._scroll)
+        source = _src(BrowserUseServer._scroll)
         assert 'scrollHeight' in source, (
             '_scroll must have lightweight JS fallback using scrollHeight for position'
         )
 
     def test_scroll_warns_agent_about_heavy_dom(self):
         """Fallback response must warn agent that DOM is too heavy and suggest alternatives."""
-        source = inspect.getsource(BrowserUseServer._scroll)
+        source = _src(BrowserUseServer._scroll)
         assert 'too heavy' in source.lower(), (
             '_scroll fallback must warn agent about heavy DOM'
         )
@@ -209,9 +227,7 @@ class TestForceFullPageEarlyExit:
 
     def test_max_iterations_reduced(self):
         """Max scroll iterations should be <= 20 (was 50)."""
-        source = inspect.getsource(BrowserUseServer._extract_content)
-
-        tree = ast.parse(textwrap.dedent(source))
+        tree = _tree(BrowserUseServer._extract_content)
         for node in ast.walk(tree):
             if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'range':
                 if node.args and isinstance(node.args[0], ast.Constant):
@@ -222,31 +238,20 @@ class TestForceFullPageEarlyExit:
 
     def test_stale_scroll_detection_exists(self):
         """force_full_page must detect stale scroll (pixels_below not decreasing)."""
-        source = inspect.getsource(BrowserUseServer._extract_content)
+        source = _src(BrowserUseServer._extract_content)
         assert 'stale' in source.lower(), (
             'force_full_page must have stale scroll detection'
         )
 
     def test_no_get_browser_state_summary_in_scroll_loop(self):
         """Scroll loop should use lightweight JS, not full get_browser_state_summary per iteration."""
-        source = inspect.getsource(BrowserUseServer._extract_content)
-
-        # Find the force_full_page section
-        fp_start = source.find('force_full_page')
-        fp_section = source[fp_start:fp_start + 2000]
+        match = _FORCE_FULL_PAGE_LOOP_RE.search(_src(BrowserUseServer._extract_content))
+        assert match, 'Could not find the force_full_page scroll loop in _extract_content'
 
         # The scroll loop should NOT call get_browser_state_summary (heavy DOM reindex)
         # It should use Runtime.evaluate with lightweight JS instead
-        lines_in_loop = fp_section.split('\n')
-        in_loop = False
-        for line in lines_in_loop:
-            if 'for ' in line and 'range(' in line:
-                in_loop = True
-            if in_loop and 'get_browser_state_summary' in line:
-                pytest.fail(
-                    'force_full_page scroll loop should NOT call get_browser_state_summary '
-                    '(causes DOM reindex per iteration, leading to timeout and 1.1GB RAM). '
-                    'Use lightweight JS via Runtime.evaluate instead.'
-                )
-            if in_loop and 'Scroll back' in line:
-                break  # End of loop section
+        assert 'get_browser_state_summary' not in match.group('loop'), (
+            'force_full_page scroll loop should NOT call get_browser_state_summary '
+            '(causes DOM reindex per iteration, leading to timeout and 1.1GB RAM). '
+            'Use lightweight JS via Runtime.evaluate instead.'
+        )
@@ -8,6 +8,8 @@ Tests cover:
 """
 
 import asyncio
+import gc
+import weakref
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -40,6 +42,12 @@ def _make_bounds(x=0, y=0, width=100, height=50):
 	return b
 
 
+def _make_far_below_snapshot(y: int):
+	"""Create a visible snapshot node positioned at the given y offset."""
+	bounds = _make_bounds(x=10, y=y, width=200, height=50)
+	return _make_snapshot_node(bounds=bounds, computed_styles={'display': 'block', 'visibility': 'visible'})
+
+
 def _make_node(
 	node_name: str = 'div',
 	attributes: dict | None = None,
@@ -71,6 +79,17 @@ def _make_node(
 	)
 
 
+def _make_text_document(text: str) -> EnhancedDOMTreeNode:
+	"""Create a #document containing a single <div> with the given text."""
+	text_node = _make_node(node_name='#text', node_type=NodeType.TEXT_NODE)
+	text_node.node_value = text
+	div = _make_node()
+	div.children_nodes = [text_node]
+	document = _make_node(node_name='#document', node_type=NodeType.DOCUMENT_NODE)
+	document.children_nodes = [div]
+	return document
+
+
 # ===========================================================================
 # FR-2: Modal viewport threshold bypass
 # ===========================================================================
@@ -79,56 +98,26 @@ def _make_node(
 class TestModalViewportBypass:
 	"""Elements inside modals should bypass viewport threshold filtering."""
 
-	def test_element_inside_role_dialog_is_visible(self):
-		"""Content inside role='dialog' should be visible regardless of viewport position."""
-		# Create a dialog parent
-		dialog = _make_node(node_name='div', attributes={'role': 'dialog'})
-
-		# Create a child element far below viewport (y=2000, beyond 1000px threshold)
-		bounds = _make_bounds(x=10, y=2000, width=200, height=50)
-		snapshot = _make_snapshot_node(bounds=bounds, computed_styles={'display': 'block', 'visibility': 'visible'})
-		child = _make_node(node_name='p', parent_node=dialog, snapshot_node=snapshot)
-
-		result = DomService.is_element_visible_according_to_all_parents(
-			child, html_frames=[], viewport_threshold=1000
-		)
-		assert result is True, 'Element inside role=dialog should bypass viewport threshold'
-
-	def test_element_inside_alertdialog_is_visible(self):
-		"""Content inside role='alertdialog' should be visible."""
-		dialog = _make_node(node_name='div', attributes={'role': 'alertdialog'})
-		bounds = _make_bounds(x=10, y=3000, width=200, height=50)
-		snapshot = _make_snapshot_node(bounds=bounds, computed_styles={'display': 'block'})
-		child = _make_node(node_name='span', parent_node=dialog, snapshot_node=snapshot)
-
-		result = DomService.is_element_visible_according_to_all_parents(
-			child, html_frames=[], viewport_threshold=1000
-		)
-		assert result is True
-
-	def test_element_inside_aria_modal_is_visible(self):
-		"""Content inside aria-modal='true' should be visible."""
-		dialog = _make_node(node_name='div', attributes={'aria-modal': 'true'})
-		bounds = _make_bounds(x=10, y=2500, width=200, height=50)
-		snapshot = _make_snapshot_node(bounds=bounds, computed_styles={'display': 'block'})
-		child = _make_node(node_name='div', parent_node=dialog, snapshot_node=snapshot)
-
-		result = DomService.is_element_visible_according_to_all_parents(
-			child, html_frames=[], viewport_threshold=1000
-		)
-		assert result is True
+	@pytest.mark.parametrize(
+		'modal_name, modal_attributes, y',
+		[
+			pytest.param('div', {'role': 'dialog'}, 2000, id='role-dialog'),
+			pytest.param('div', {'role': 'alertdialog'}, 3000, id='role-alertdialog'),
+			pytest.param('div', {'aria-modal': 'true'}, 2500, id='aria-modal'),
+			pytest.param('dialog', {}, 2000, id='native-dialog'),
+		],
+	)
+	def test_element_inside_modal_is_visible(self, modal_name, modal_attributes, y):
+		"""Content inside a dialog/alertdialog/aria-modal/<dialog> should be visible regardless of viewport position."""
+		dialog = _make_node(node_name=modal_name, attributes=modal_attributes)
 
-	def test_element_inside_native_dialog_is_visible(self):
-		"""Content inside <dialog> element should be visible."""
-		dialog = _make_node(node_name='dialog', attributes={})
-		bounds = _make_bounds(x=10, y=2000, width=200, height=50)
-		snapshot = _make_snapshot_node(bounds=bounds, computed_styles={'display': 'block'})
-		child = _make_node(node_name='p', parent_node=dialog, snapshot_node=snapshot)
+		# Child element far below viewport (beyond 1000px threshold)
+		child = _make_node(node_name='p', parent_node=dialog, snapshot_node=_make_far_below_snapshot(y))
 
 		result = DomService.is_element_visible_according_to_all_parents(
 			child, html_frames=[], viewport_threshold=1000
 		)
-		assert result is True
+		assert result is True, f'Element inside {modal_name} {modal_attributes} should bypass viewport threshold'
 
 	def test_element_outside_modal_still_filtered(self):
 		"""Elements NOT inside a modal should still be filtered by viewport threshold."""
@@ -189,65 +178,82 @@ class TestModalViewportBypass:
 # ===========================================================================
 
 
+@pytest.fixture
+def mock_cdp_session():
+	"""CDP session mock whose Page.navigate starts loader-1, with no lifecycle events stored yet.
+
+	spec_set limits it to the attributes _navigate_and_wait reads, so a mistyped name fails loudly
+	instead of silently auto-creating a child mock.
+	"""
+	cdp_session = MagicMock(spec_set=['target_id', 'session_id', 'cdp_client', '_lifecycle_events', '_lifecycle_signal'])
+	cdp_session.target_id = 'ABCDEF1234567890'
+	cdp_session.session_id = 'session-123'
+	cdp_session.cdp_client = MagicMock()
+	cdp_session.cdp_client.send.Page.navigate = AsyncMock(return_value={'loaderId': 'loader-1'})
+	cdp_session._lifecycle_events = []
+	cdp_session._lifecycle_signal = asyncio.Event()
+	return cdp_session
+
+
+@pytest.fixture
+def navigating_session(mock_cdp_session):
+	"""BrowserSession whose get_or_create_cdp_session returns mock_cdp_session."""
+	from browser_use.browser.session import BrowserSession
+
+	session = BrowserSession(headless=True)
+
+	# Mock session_manager via Pydantic field (it's a declared Field, not extra)
+	mock_target = MagicMock()
+	mock_target.url = 'https://old-page.com'
+	session.session_manager = MagicMock()
+	session.session_manager.get_target.return_value = mock_target
+
+	# Patch on the CLASS to bypass Pydantic's extra='forbid'
+	with patch.object(BrowserSession, 'get_or_create_cdp_session', new=AsyncMock(return_value=mock_cdp_session)):
+		yield session
+
+
 class TestNavigateAndWaitTimeout:
 	"""_navigate_and_wait() must raise TimeoutError when lifecycle events don't arrive."""
 
 	@pytest.mark.asyncio
-	async def test_raises_timeout_error_when_no_events(self):
+	async def test_raises_timeout_error_when_no_events(self, navigating_session):
 		"""Should raise TimeoutError when no lifecycle events are received."""
-		from browser_use.browser.session import BrowserSession
+		with pytest.raises(TimeoutError, match='timed out'):
+			await navigating_session._navigate_and_wait('https://example.com', 'ABCDEF1234567890', timeout=0.1)
 
-		session = BrowserSession(headless=True)
+	@pytest.mark.asyncio
+	async def test_raises_timeout_with_partial_events(self, navigating_session, mock_cdp_session):
+		"""Should raise TimeoutError even when some events arrive but not networkIdle/load."""
+		# Has events but not networkIdle or load
+		mock_cdp_session._lifecycle_events.extend(
+			[
+				{'name': 'commit', 'loaderId': 'loader-1'},
+				{'name': 'DOMContentLoaded', 'loaderId': 'loader-1'},
+			]
+		)
 
-		# Mock session_manager via Pydantic field (it's a declared Field, not extra)
-		mock_target = MagicMock()
-		mock_target.url = 'https://old-page.com'
-		session.session_manager = MagicMock()
-		session.session_manager.get_target.return_value = mock_target
-
-		# Mock CDP session with empty lifecycle events
-		mock_cdp_session = MagicMock()
-		mock_cdp_session.target_id = 'ABCDEF1234567890'
-		mock_cdp_session._lifecycle_events = []  # No events
-		mock_cdp_session.session_id = 'session-123'
-		mock_cdp_session.cdp_client = MagicMock()
-		mock_cdp_session.cdp_client.send = MagicMock()
-		mock_cdp_session.cdp_client.send.Page = MagicMock()
-		mock_cdp_session.cdp_client.send.Page.navigate = AsyncMock(return_value={'loaderId': 'loader-1'})
-
-		# Patch on the CLASS to bypass Pydantic's extra='forbid'
-		with patch.object(BrowserSession, 'get_or_create_cdp_session', new=AsyncMock(return_value=mock_cdp_session)):
-			with pytest.raises(TimeoutError, match='timed out'):
-				await session._navigate_and_wait('https://example.com', 'ABCDEF1234567890', timeout=0.1)
+		with pytest.raises(TimeoutError, match='events seen'):
+			await navigating_session._navigate_and_wait('https://example.com', 'ABCDEF1234567890', timeout=0.1)
 
 	@pytest.mark.asyncio
-	async def test_raises_timeout_with_partial_events(self):
-		"""Should raise TimeoutError even when some events arrive but not networkIdle/load."""
-		from browser_use.browser.session import BrowserSession
+	async def test_returns_when_load_is_signalled(self, navigating_session, mock_cdp_session):
+		"""A load event stored after navigation should wake the wait without running out the timeout."""
 
-		session = BrowserSession(headless=True)
+		def store_load_event():
+			# What SessionManager's lifecycle handler does when Page.lifecycleEvent fires
+			mock_cdp_session._lifecycle_events.append({'name': 'load', 'loaderId': 'loader-1'})
+			mock_cdp_session._lifecycle_signal.set()
 
-		mock_target = MagicMock()
-		mock_target.url = 'https://old-page.com'
-		session.session_manager = MagicMock()
-		session.session_manager.get_target.return_value = mock_target
+		async def navigate(**kwargs):
+			asyncio.get_running_loop().call_later(0.05, store_load_event)
+			return {'loaderId': 'loader-1'}
 
-		mock_cdp_session = MagicMock()
-		mock_cdp_session.target_id = 'ABCDEF1234567890'
-		# Has events but not networkIdle or load
-		mock_cdp_session._lifecycle_events = [
-			{'name': 'commit', 'loaderId': 'loader-1'},
-			{'name': 'DOMContentLoaded', 'loaderId': 'loader-1'},
-		]
-		mock_cdp_session.session_id = 'session-123'
-		mock_cdp_session.cdp_client = MagicMock()
-		mock_cdp_session.cdp_client.send = MagicMock()
-		mock_cdp_session.cdp_client.send.Page = MagicMock()
-		mock_cdp_session.cdp_client.send.Page.navigate = AsyncMock(return_value={'loaderId': 'loader-1'})
+		mock_cdp_session.cdp_client.send.Page.navigate = AsyncMock(side_effect=navigate)
 
-		with patch.object(BrowserSession, 'get_or_create_cdp_session', new=AsyncMock(return_value=mock_cdp_session)):
-			with pytest.raises(TimeoutError, match='events seen'):
-				await session._navigate_and_wait('https://example.com', 'ABCDEF1234567890', timeout=0.1)
+		start = asyncio.get_running_loop().time()
+		await navigating_session._navigate_and_wait('https://example.com', 'ABCDEF1234567890', timeout=5.0)
+		assert asyncio.get_running_loop().time() - start < 1.0
 
 
 # ===========================================================================
@@ -269,6 +275,7 @@ class TestNavigationCompleteEventClearsCache:
 		# Set up cached state
 		session._cached_browser_state_summary = 'old_state'
 		session._cached_selector_map = {1: 'element1', 2: 'element2'}
+		session._cached_markdown[(False, False, True)] = ('old_tree', 'old markdown', {})
 
 		# Mock DOM watchdog
 		mock_watchdog = MagicMock()
@@ -279,6 +286,7 @@ class TestNavigationCompleteEventClearsCache:
 
 		assert session._cached_browser_state_summary is None, 'Cached state should be cleared'
 		assert len(session._cached_selector_map) == 0, 'Selector map should be cleared'
+		assert not session._cached_markdown, 'Extracted markdown should be cleared'
 		mock_watchdog.clear_cache.assert_called_once()
 
 		# Test again on same instance without DOM watchdog (should not crash)
@@ -291,3 +299,108 @@ class TestNavigationCompleteEventClearsCache:
 
 		assert session._cached_browser_state_summary is None
 		assert len(session._cached_selector_map) == 0
+
+
+class TestExtractedMarkdownCache:
+	"""extract_clean_markdown caches per DOM tree object without keeping the tree alive."""
+
+	@pytest.mark.asyncio
+	async def test_extracted_markdown_reused_for_same_dom_tree(self):
+		"""extract_clean_markdown should return the cached result while the same DOM tree is current."""
+		from browser_use.browser.session import BrowserSession
+		from browser_use.dom.markdown_extractor import extract_clean_markdown
+
+		session = BrowserSession(headless=True)
+		tree = _make_text_document('page text')
+		session._cached_markdown[(False, False, True)] = (weakref.ref(tree), 'cached markdown', {'method': 'enhanced_dom_tree'})
+
+		with patch(
+			'browser_use.dom.markdown_extractor._get_enhanced_dom_tree_from_browser_session', new=AsyncMock(return_value=tree)
+		):
+			content, stats = await extract_clean_markdown(browser_session=session, include_interactive=True)
+
+		assert content == 'cached markdown'
+		assert stats == {'method': 'enhanced_dom_tree'}
+		# Callers mutate stats, so the cached dict must not be handed out
+		stats['chunk_index'] = 0
+		assert 'chunk_index' not in session._cached_markdown[(False, False, True)][2]
+
+	@pytest.mark.asyncio
+	async def test_extracted_markdown_recomputed_for_new_dom_tree(self):
+		"""A rebuilt DOM tree at the same cache key must miss and replace the entry."""
+		from browser_use.browser.session import BrowserSession
+		from browser_use.dom.markdown_extractor import extract_clean_markdown
+
+		session = BrowserSession(headless=True)
+		old_tree = _make_text_document('old page')
+		session._cached_markdown[(False, False, False)] = (weakref.ref(old_tree), 'cached markdown', {})
+		new_tree = _make_text_document('fresh page')
+
+		with (
+			patch(
+				'browser_use.dom.markdown_extractor._get_enhanced_dom_tree_from_browser_session',
+				new=AsyncMock(return_value=new_tree),
+			),
+			patch.object(BrowserSession, 'get_current_page_url', AsyncMock(return_value='https://example.com')),
+		):
+			content, _ = await extract_clean_markdown(browser_session=session)
+
+		assert 'fresh page' in content
+		assert 'cached markdown' not in content
+		assert session._cached_markdown[(False, False, False)][0]() is new_tree
+
+	@pytest.mark.asyncio
+	async def test_extracted_markdown_cache_does_not_keep_dom_tree_alive(self):
+		"""The cache entry must not hold a strong reference to the DOM tree."""
+		from browser_use.browser.session import BrowserSession
+		from browser_use.dom.markdown_extractor import extract_clean_markdown
+
+		session = BrowserSession(headless=True)
+		tree = _make_text_document('page text')
+
+		with (
+			patch(
+				'browser_use.dom.markdown_extractor._get_enhanced_dom_tree_from_browser_session',
+				new=AsyncMock(return_value=tree),
+			),
+			patch.object(BrowserSession, 'get_current_page_url', AsyncMock(return_value='https://example.com')),
+		):
+			await extract_clean_markdown(browser_session=session)
+
+		tree_ref = weakref.ref(tree)
+		del tree
+		gc.collect()
+
+		assert tree_ref() is None
+		assert session._cached_markdown[(False, False, False)][0]() is None
+
+	@pytest.mark.asyncio
+	async def test_extracted_markdown_cleared_on_reset(self):
+		"""reset() should drop cached markdown along with the rest of the session caches."""
+		from browser_use.browser.session import BrowserSession
+
+		session = BrowserSession(headless=True)
+		tree = _make_text_document('page text')
+		session._cached_markdown[(False, False, False)] = (weakref.ref(tree), 'cached markdown', {})
+
+		await session.reset()
+
+		assert not session._cached_markdown
+
+	@pytest.mark.asyncio
+	async def test_extracted_markdown_cleared_on_agent_focus_change(self):
+		"""Switching the focused tab should drop cached markdown."""
+		from browser_use.browser.events import AgentFocusChangedEvent
+		from browser_use.browser.session import BrowserSession
+
+		session = BrowserSession(headless=True)
+		tree = _make_text_document('page text')
+		session._cached_markdown[(False, False, False)] = (weakref.ref(tree), 'cached markdown', {})
+
+		with (
+			patch.object(BrowserSession, 'get_or_create_cdp_session', AsyncMock()),
+			patch.object(BrowserSession, '_cdp_set_viewport', AsyncMock()),
+		):
+			await session.on_AgentFocusChangedEvent(AgentFocusChangedEvent(target_id='target-123', url='https://example.com'))
+
+		assert not session._cached_markdown
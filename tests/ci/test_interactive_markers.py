@@ -4,7 +4,6 @@ Validates that [btn:N], [link:N], [input:N type=X], [select:N], [textarea:N]
 markers appear in markdown output when include_interactive=True.
 """
 
-import asyncio
 import os
 
 import pytest
@@ -88,16 +87,38 @@ async def browser_session():
 	await session.kill()
 
 
+@pytest.fixture(scope='module')
+def extracted_markdown():
+	"""Extraction results keyed by (url, include_interactive); the served page never changes."""
+	return {}
+
+
 # --- Helper ---
 
 
 async def _navigate_and_wait(browser_session, url):
-	"""Navigate to URL and wait for page load."""
+	"""Navigate to URL and wait for page load.
+
+	The navigate action completes once the session has seen the page's networkIdle/load
+	lifecycle event, so no extra sleep is needed. Navigation failures come back as result.error.
+	"""
 	from browser_use.tools.service import Tools
 
 	tools = Tools()
-	await tools.navigate(url=url, new_tab=False, browser_session=browser_session)
-	await asyncio.sleep(0.5)
+	result = await tools.navigate(url=url, new_tab=False, browser_session=browser_session)
+	assert not result.error, result.error
+
+
+async def _extract(browser_session, extracted_markdown, url, include_interactive):
+	"""Navigate and extract once per (url, include_interactive), reusing the cached result afterwards."""
+	key = (url, include_interactive)
+	if key not in extracted_markdown:
+		await _navigate_and_wait(browser_session, url)
+		extracted_markdown[key] = await extract_clean_markdown(
+			browser_session=browser_session,
+			include_interactive=include_interactive,
+		)
+	return extracted_markdown[key]
 
 
 # --- Tests ---
@@ -116,14 +137,9 @@ class TestBrowserStartAndNavigate:
 		url = await browser_session.get_current_page_url()
 		assert '/interactive' in url
 
-	async def test_extract_markdown_basic(self, browser_session, base_url):
+	async def test_extract_markdown_basic(self, browser_session, base_url, extracted_markdown):
 		"""extract_clean_markdown returns non-empty content."""
-		await _navigate_and_wait(browser_session, f'{base_url}/interactive')
-
-		content, stats = await extract_clean_markdown(
-			browser_session=browser_session,
-			include_interactive=False,
-		)
+		content, stats = await _extract(browser_session, extracted_markdown, f'{base_url}/interactive', False)
 
 		assert len(content) > 0
 		assert 'Test Page' in content
@@ -133,14 +149,9 @@ class TestBrowserStartAndNavigate:
 class TestInteractiveMarkers:
 	"""Verify interactive element markers in markdown output."""
 
-	async def test_markers_present_when_enabled(self, browser_session, base_url):
+	async def test_markers_present_when_enabled(self, browser_session, base_url, extracted_markdown):
 		"""include_interactive=True produces [btn:], [link:], [input:], etc. markers."""
-		await _navigate_and_wait(browser_session, f'{base_url}/interactive')
-
-		content, stats = await extract_clean_markdown(
-			browser_session=browser_session,
-			include_interactive=True,
-		)
+		content, stats = await _extract(browser_session, extracted_markdown, f'{base_url}/interactive', True)
 
 		# Print for visual inspection
 		print('\n--- MARKDOWN WITH MARKERS ---')
@@ -163,14 +174,9 @@ class TestInteractiveMarkers:
 		# Textarea
 		assert '[textarea:' in content, f'No textarea markers found in:\n{content}'
 
-	async def test_markers_absent_when_disabled(self, browser_session, base_url):
+	async def test_markers_absent_when_disabled(self, browser_session, base_url, extracted_markdown):
 		"""include_interactive=False (default) produces no markers."""
-		await _navigate_and_wait(browser_session, f'{base_url}/interactive')
-
-		content, stats = await extract_clean_markdown(
-			browser_session=browser_session,
-			include_interactive=False,
-		)
+		content, stats = await _extract(browser_session, extracted_markdown, f'{base_url}/interactive', False)
 
 		assert '[btn:' not in content
 		assert '[link:' not in content
@@ -178,26 +184,16 @@ class TestInteractiveMarkers:
 		assert '[select:' not in content
 		assert '[textarea:' not in content
 
-	async def test_interactive_count_in_stats(self, browser_session, base_url):
+	async def test_interactive_count_in_stats(self, browser_session, base_url, extracted_markdown):
 		"""Stats include interactive_elements count when markers enabled."""
-		await _navigate_and_wait(browser_session, f'{base_url}/interactive')
-
-		content, stats = await extract_clean_markdown(
-			browser_session=browser_session,
-			include_interactive=True,
-		)
+		content, stats = await _extract(browser_session, extracted_markdown, f'{base_url}/interactive', True)
 
 		assert 'interactive_elements' in stats
 		# Page has: 2 buttons + 2 links + 3 inputs + 1 select + 1 textarea = 9 minimum
 		assert stats['interactive_elements'] > 0
 
-	async def test_input_type_in_marker(self, browser_session, base_url):
+	async def test_input_type_in_marker(self, browser_session, base_url, extracted_markdown):
 		"""Input markers include type= attribute."""
-		await _navigate_and_wait(browser_session, f'{base_url}/interactive')
-
-		content, stats = await extract_clean_markdown(
-			browser_session=browser_session,
-			include_interactive=True,
-		)
+		content, stats = await _extract(browser_session, extracted_markdown, f'{base_url}/interactive', True)
 
 		assert 'type=text' in content or 'type=password' in content or 'type=email' in content
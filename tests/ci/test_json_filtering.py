@@ -90,3 +90,25 @@ class TestSkipJsonFiltering:
 
 		# Should have at most 3 consecutive newlines
 		assert '\n\n\n\n' not in filtered
+
+	def test_type_field_json_wrapping_code_block_removed(self):
+		"""A $type blob interrupted by inline backtick JSON should be removed once the inner block is gone."""
+		content = 'text {"$type":' + 'x' * 60 + '`{"a":1}`' + 'x' * 60 + '} tail'
+
+		filtered, _ = _preprocess_markdown_content(content)
+
+		assert 'x' * 60 not in filtered
+		assert '$type' not in filtered
+		assert 'text' in filtered
+		assert 'tail' in filtered
+
+	def test_nested_json_wrapping_code_block_removed(self):
+		"""A nested JSON blob interrupted by inline backtick JSON should be removed once the inner block is gone."""
+		content = 'text {"config_key":{' + 'x' * 60 + '`{"b":2}`' + 'x' * 60 + '} tail'
+
+		filtered, _ = _preprocess_markdown_content(content)
+
+		assert 'x' * 60 not in filtered
+		assert 'config_key' not in filtered
+		assert 'text' in filtered
+		assert 'tail' in filtered
@@ -77,13 +77,11 @@ class TestPreprocessMarkdownContent:
 		assert small_json in filtered
 
 	def test_compresses_multiple_newlines(self):
-		"""4+ consecutive newlines should be compressed to max_newlines."""
+		"""Runs of blank lines should collapse to a single newline."""
 		content = 'Header\n\n\n\n\nFooter'
-		filtered, _ = _preprocess_markdown_content(content, max_newlines=2)
+		filtered, _ = _preprocess_markdown_content(content)
 
-		# After filtering empty lines, we should have just Header and Footer
-		lines = [line for line in filtered.split('\n') if line.strip()]
-		assert lines == ['Header', 'Footer']
+		assert filtered == 'Header\nFooter'
 
 	def test_returns_chars_filtered_count(self):
 		"""Should return count of characters removed."""
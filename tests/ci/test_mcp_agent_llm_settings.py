@@ -0,0 +1,91 @@
+"""Tests for the agent LLM settings that the MCP server's retry_with_browser_use_agent tool uses."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from browser_use.mcp.server import BrowserUseServer
+
+_AGENT_LLM_ENV = (
+	'MODEL_PROVIDER',
+	'BROWSER_USE_AGENT_MODEL',
+	'BROWSER_USE_PATTERNS_PATH',
+	'REGION',
+	'ANTHROPIC_API_KEY',
+	'GOOGLE_VERTEXAI',
+	'GOOGLE_CLOUD_PROJECT',
+	'GOOGLE_CLOUD_LOCATION',
+	'GOOGLE_API_KEY',
+	'OPENAI_API_KEY',
+	'OPENAI_PROXY_BASE_URL',
+	'BROWSER_USE_LLM_PROVIDER',
+)
+
+
+@pytest.fixture
+def env(monkeypatch):
+	"""monkeypatch with every agent LLM env var cleared."""
+	for name in _AGENT_LLM_ENV:
+		monkeypatch.delenv(name, raising=False)
+	return monkeypatch
+
+
+def _make_server() -> BrowserUseServer:
+	"""Create a server with an empty config file so only env vars feed the settings."""
+	with patch('browser_use.mcp.server.load_browser_use_config', return_value={}):
+		return BrowserUseServer()
+
+
+async def _run_retry(server: BrowserUseServer) -> tuple[MagicMock, MagicMock, MagicMock]:
+	"""Run the retry tool with the agent stubbed out; return the mocked agent and LLM classes."""
+	agent_cls = MagicMock()
+	agent_cls.return_value.run = AsyncMock(side_effect=RuntimeError('stop'))
+	agent_cls.return_value.close = AsyncMock()
+	with (
+		patch.object(server, '_init_browser_session', AsyncMock()),
+		patch('browser_use.mcp.server.PatternLearningAgent', agent_cls),
+		patch('browser_use.mcp.server.ChatAnthropic') as anthropic_cls,
+		patch('browser_use.mcp.server.ChatOpenAI') as openai_cls,
+	):
+		result = await server._retry_with_browser_use_agent('task')
+	assert result == 'Agent task failed: stop'
+	return agent_cls, anthropic_cls, openai_cls
+
+
+async def test_retry_uses_startup_provider_and_keys(env):
+	"""Env changes after construction must not mix a startup provider with runtime credentials."""
+	env.setenv('MODEL_PROVIDER', 'anthropic')
+	env.setenv('ANTHROPIC_API_KEY', 'startup-key')
+	env.setenv('BROWSER_USE_PATTERNS_PATH', '/startup/patterns.json')
+	server = _make_server()
+
+	env.setenv('MODEL_PROVIDER', 'openai')
+	env.setenv('ANTHROPIC_API_KEY', 'runtime-key')
+	env.setenv('OPENAI_API_KEY', 'runtime-openai-key')
+	env.setenv('BROWSER_USE_PATTERNS_PATH', '/runtime/patterns.json')
+
+	agent_cls, anthropic_cls, openai_cls = await _run_retry(server)
+
+	anthropic_cls.assert_called_once()
+	assert anthropic_cls.call_args.kwargs['api_key'] == 'startup-key'
+	openai_cls.assert_not_called()
+	assert agent_cls.call_args.kwargs['patterns_path'] == '/startup/patterns.json'
+
+
+async def test_retry_openai_branch_uses_startup_proxy_settings(env):
+	"""The OpenAI-compatible branch reads its key, base URL and provider from the startup snapshot."""
+	env.setenv('OPENAI_API_KEY', 'startup-key')
+	env.setenv('OPENAI_PROXY_BASE_URL', 'http://proxy.local/v1/')
+	env.setenv('BROWSER_USE_LLM_PROVIDER', 'acme')
+	server = _make_server()
+
+	env.setenv('OPENAI_API_KEY', 'runtime-key')
+	env.setenv('OPENAI_PROXY_BASE_URL', 'http://other.local/v1')
+	env.setenv('BROWSER_USE_LLM_PROVIDER', 'other')
+
+	_, anthropic_cls, openai_cls = await _run_retry(server)
+
+	anthropic_cls.assert_not_called()
+	openai_kwargs = openai_cls.call_args.kwargs
+	assert openai_kwargs['api_key'] == 'startup-key'
+	assert openai_kwargs['base_url'] == 'http://proxy.local/v1/acme'
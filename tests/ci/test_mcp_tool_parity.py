@@ -17,6 +17,15 @@ import asyncio
 from browser_use.mcp.server import SessionState
 
 
+class _AwaitableEvent:
+    """Stand-in for a dispatched bubus event that completes as soon as it is awaited."""
+
+    __slots__ = ()
+
+    def __await__(self):
+        return iter(())
+
+
 class TestTabIdInGetState:
     """FR-1: browser_get_state should include tab_id in tabs list."""
 
@@ -40,6 +49,18 @@ class TestTabIdInGetState:
         assert serialized['tab_id'] == '5678', "tab_id should be last 4 chars of target_id"
         assert 'target_id' not in serialized, "target_id should not appear with by_alias=True"
 
+    def test_tab_list_adapter_matches_model_dump(self):
+        """The bulk tab serializer must produce the same dicts as per-tab model_dump(by_alias=True)."""
+        from browser_use.browser.views import TabInfo
+        from browser_use.mcp.server import _TABINFO_LIST_ADAPTER
+
+        tabs = [
+            TabInfo(target_id='ABCD1234EFGH5678', url='https://example.com', title='Example'),
+            TabInfo(target_id='WXYZ0000', url='https://popup.com', title='Popup', parent_target_id='ABCD1234EFGH5678'),
+        ]
+
+        assert _TABINFO_LIST_ADAPTER.dump_python(tabs, by_alias=True) == [tab.model_dump(by_alias=True) for tab in tabs]
+
 
 class TestEnhancedScroll:
     """FR-2: Enhanced scroll with viewport detection and position feedback."""
@@ -71,14 +92,9 @@ class TestEnhancedScroll:
         # Mock event bus - capture dispatched event
         dispatched_events = []
 
-        class AwaitableEvent:
-            """Mock event that can be awaited."""
-            def __await__(self):
-                return iter([])
-
         def capture_dispatch(event):
             dispatched_events.append(event)
-            return AwaitableEvent()
+            return _AwaitableEvent()
 
         mock_event_bus = MagicMock()
         mock_event_bus.dispatch = capture_dispatch
@@ -238,6 +254,37 @@ class TestEnhancedClick:
 
         assert 'Downloaded' in result or 'report.pdf' in result
 
+    @pytest.mark.asyncio
+    async def test_click_validation_error_skips_tab_detection(self):
+        """A refused click reports the warning without looking for new tabs."""
+        from browser_use.mcp.server import BrowserUseServer
+
+        server = BrowserUseServer()
+
+        mock_browser_session = MagicMock()
+        mock_browser_session.get_tabs = AsyncMock(return_value=[])
+
+        session_state = SessionState(
+            session_id='test-session',
+            browser_session=mock_browser_session,
+            tools=MagicMock(),
+            file_system=MagicMock(),
+            session_lock=asyncio.Lock(),
+            created_at=0.0,
+            last_activity=0.0,
+        )
+
+        result = await server._build_click_response(
+            element_desc='Select "Country"',
+            index=4,
+            click_metadata={'validation_error': 'Cannot click on <select> elements.'},
+            tabs_before=frozenset(),
+            session=session_state,
+        )
+
+        assert 'Warning: Cannot click on <select> elements.' in result
+        mock_browser_session.get_tabs.assert_not_called()
+
 
 class TestEnhancedType:
     """FR-4: Enhanced type with actual_value feedback."""
@@ -349,3 +396,76 @@ class TestFindText:
         result = await server._find_text(text='nonexistent text', session=session_state)
 
         assert 'not found' in result.lower() or 'not visible' in result.lower()
+
+
+class TestSwitchTab:
+    """browser_switch_tab refreshes the browser state for the new tab."""
+
+    @pytest.mark.asyncio
+    async def test_switch_tab_refreshes_selector_map(self):
+        """Verify _switch_tab rebuilds the state so index-based actions target the new tab."""
+        from browser_use.mcp.server import BrowserUseServer
+
+        server = BrowserUseServer()
+
+        mock_browser_session = MagicMock()
+        mock_browser_session.get_target_id_from_tab_id = AsyncMock(return_value='TARGET_ABCD')
+        mock_browser_session.get_browser_state_summary = AsyncMock(return_value=MagicMock(url='https://other.com'))
+
+        mock_browser_session.event_bus.dispatch = MagicMock(return_value=_AwaitableEvent())
+
+        session_state = SessionState(
+            session_id='test-session',
+            browser_session=mock_browser_session,
+            tools=MagicMock(),
+            file_system=MagicMock(),
+            session_lock=asyncio.Lock(),
+            created_at=0.0,
+            last_activity=0.0,
+        )
+
+        result = await server._switch_tab(tab_id='ABCD', session=session_state)
+
+        assert result == 'Switched to tab ABCD: https://other.com'
+        mock_browser_session.get_browser_state_summary.assert_awaited_once()
+
+
+class TestEvaluateJs:
+    """browser_evaluate always returns a str, whatever CDP reports."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        'eval_result, expected',
+        [
+            ({'type': 'string', 'value': 'Example Domain'}, 'Example Domain'),
+            # A string result without a value must not leak None to the caller
+            ({'type': 'string'}, 'null'),
+            ({'type': 'number', 'value': 42}, '42'),
+            ({'type': 'undefined'}, 'JavaScript executed (no return value)'),
+        ],
+        ids=['string', 'string_without_value', 'number', 'undefined'],
+    )
+    async def test_evaluate_js_returns_str(self, eval_result, expected):
+        """Verify _evaluate_js coerces every CDP result to a str."""
+        from browser_use.mcp.server import BrowserUseServer
+
+        server = BrowserUseServer()
+
+        mock_cdp_session = MagicMock()
+        mock_cdp_session.cdp_client.send.Runtime.evaluate = AsyncMock(return_value={'result': eval_result})
+        mock_browser_session = MagicMock()
+        mock_browser_session.get_or_create_cdp_session = AsyncMock(return_value=mock_cdp_session)
+
+        session_state = SessionState(
+            session_id='test-session',
+            browser_session=mock_browser_session,
+            tools=MagicMock(),
+            file_system=MagicMock(),
+            session_lock=asyncio.Lock(),
+            created_at=0.0,
+            last_activity=0.0,
+        )
+
+        result = await server._evaluate_js('document.title', session=session_state)
+
+        assert result == expected
@@ -13,11 +13,11 @@ Covers:
 """
 
 import asyncio
-import json
 import time
 from dataclasses import fields as dataclass_fields
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import mcp.types as types
 import pytest
 
 from browser_use.mcp.server import BrowserUseServer, SessionState
@@ -47,6 +47,27 @@ def _make_server() -> BrowserUseServer:
     return BrowserUseServer()
 
 
+@pytest.fixture(scope='module')
+def _base_server() -> BrowserUseServer:
+    """One server per module: construction registers every MCP tool handler, which is pure setup."""
+    return _make_server()
+
+
+@pytest.fixture
+def server(_base_server: BrowserUseServer):
+    """The shared server with its per-test session state reset and an empty config."""
+    loaded_config = _base_server.config
+    _base_server.config = {}
+    _base_server.sessions.clear()
+    _base_server.default_session_id = None
+    _base_server.max_sessions = 10
+    _base_server.browser_session = None
+    _base_server.tools = None
+    _base_server.file_system = None
+    yield _base_server
+    _base_server.config = loaded_config
+
+
 def _make_bs_mock(**kwargs):
     """Create a MagicMock that acts like BrowserSession (instance.start() is awaitable)."""
     mock = MagicMock(**kwargs)
@@ -54,6 +75,52 @@ def _make_bs_mock(**kwargs):
     return mock
 
 
+class _AwaitableEvent:
+    """Stand-in for a dispatched bubus event: awaitable, with an empty result."""
+
+    __slots__ = ()
+
+    def __await__(self):
+        return iter(())
+
+    async def event_result(self, **kwargs):
+        return None
+
+
+def _make_mock_bs(url: str, **kwargs):
+    """Create a MagicMock BrowserSession whose dispatched events complete immediately."""
+    bs = MagicMock(**kwargs)
+    bs.start = AsyncMock()
+    bs.event_bus = MagicMock()
+    bs.get_current_page_url = AsyncMock(return_value=url)
+    bs.event_bus.dispatch = MagicMock(return_value=_AwaitableEvent())
+    return bs
+
+
+@pytest.fixture
+def patched_browser(server, monkeypatch):
+    """Stub out browser launch for session creation; returns the BrowserSession class mock."""
+    import browser_use.mcp.server as server_module
+
+    mock_bs_class = _make_bs_mock()
+    monkeypatch.setattr(server_module, 'get_default_profile', lambda config: {})
+    monkeypatch.setattr(server_module, 'BrowserSession', mock_bs_class)
+    return mock_bs_class
+
+
+@pytest.fixture
+def populated_server(server):
+    """Seed the server with stoppable mock sessions; the first ID becomes the default."""
+
+    def _populate(session_ids):
+        for sid in session_ids:
+            mock_bs = MagicMock()
+            mock_bs.stop = AsyncMock()
+            server.sessions[sid] = _make_session_state(session_id=sid, browser_session=mock_bs)
+        server.default_session_id = session_ids[0]
+        return server
+
+    return _populate
 
 
 # ===========================================================================
@@ -88,6 +155,13 @@ class TestSessionState:
         assert isinstance(ss.created_at, float)
         assert isinstance(ss.last_activity, float)
 
+    def test_session_state_has_no_instance_dict(self):
+        """SessionState uses slots and rejects attributes outside its declared fields."""
+        ss = _make_session_state()
+        assert not hasattr(ss, '__dict__')
+        with pytest.raises(AttributeError):
+            ss.unexpected_field = 1
+
 
 # ===========================================================================
 # 2. Session creation
@@ -97,96 +171,51 @@ class TestSessionCreation:
     """Tests for _create_session."""
 
     @pytest.mark.asyncio
-    async def test_create_session_generates_id(self):
-        """_create_session auto-generates a session_id when none provided."""
-        server = _make_server()
-
-        with patch.object(server, 'config', {}), \
-             patch('browser_use.mcp.server.get_default_profile', return_value={}), \
-             patch('browser_use.mcp.server.BrowserSession', new_callable=_make_bs_mock):
-            session_id = await server._create_session()
-
-        assert isinstance(session_id, str)
-        assert len(session_id) == 8  # uuid4()[:8]
-
-    @pytest.mark.asyncio
-    async def test_create_session_uses_provided_id(self):
-        """_create_session uses the caller-supplied session_id."""
-        server = _make_server()
-
-        with patch.object(server, 'config', {}), \
-             patch('browser_use.mcp.server.get_default_profile', return_value={}), \
-             patch('browser_use.mcp.server.BrowserSession', new_callable=_make_bs_mock):
-            session_id = await server._create_session(session_id='my-custom-id')
-
-        assert session_id == 'my-custom-id'
-
-    @pytest.mark.asyncio
-    async def test_create_session_adds_to_sessions_dict(self):
-        """Created session must appear in server.sessions."""
-        server = _make_server()
-
-        with patch.object(server, 'config', {}), \
-             patch('browser_use.mcp.server.get_default_profile', return_value={}), \
-             patch('browser_use.mcp.server.BrowserSession', new_callable=_make_bs_mock):
-            session_id = await server._create_session(session_id='sess-1')
-
-        assert 'sess-1' in server.sessions
-        assert isinstance(server.sessions['sess-1'], SessionState)
-
-    @pytest.mark.asyncio
-    async def test_create_session_sets_default_for_first(self):
-        """First created session becomes the default."""
-        server = _make_server()
+    @pytest.mark.parametrize(
+        'requested_id',
+        [None, 'my-custom-id'],
+        ids=['generated', 'provided'],
+    )
+    async def test_create_first_session(self, server, patched_browser, requested_id):
+        """_create_session returns the provided (or a generated uuid4()[:8]) id, registers it and makes it the default."""
         assert server.default_session_id is None
 
-        with patch.object(server, 'config', {}), \
-             patch('browser_use.mcp.server.get_default_profile', return_value={}), \
-             patch('browser_use.mcp.server.BrowserSession', new_callable=_make_bs_mock):
-            session_id = await server._create_session(session_id='first')
+        session_id = await server._create_session(session_id=requested_id)
 
-        assert server.default_session_id == 'first'
+        assert isinstance(session_id, str)
+        if requested_id is None:
+            assert len(session_id) == 8  # uuid4()[:8]
+        else:
+            assert session_id == requested_id
+        assert isinstance(server.sessions[session_id], SessionState)
+        assert server.default_session_id == session_id
 
     @pytest.mark.asyncio
-    async def test_create_session_does_not_overwrite_default(self):
+    async def test_create_session_does_not_overwrite_default(self, server, patched_browser):
         """Second session must NOT replace the default."""
-        server = _make_server()
-
-        with patch.object(server, 'config', {}), \
-             patch('browser_use.mcp.server.get_default_profile', return_value={}), \
-             patch('browser_use.mcp.server.BrowserSession', new_callable=_make_bs_mock):
-            await server._create_session(session_id='first')
-            await server._create_session(session_id='second')
+        await server._create_session(session_id='first')
+        await server._create_session(session_id='second')
 
         assert server.default_session_id == 'first'
 
     @pytest.mark.asyncio
-    async def test_create_session_duplicate_id_raises(self):
+    async def test_create_session_duplicate_id_raises(self, server, patched_browser):
         """Creating a session with an existing ID must raise RuntimeError."""
-        server = _make_server()
+        await server._create_session(session_id='dup')
 
-        with patch.object(server, 'config', {}), \
-             patch('browser_use.mcp.server.get_default_profile', return_value={}), \
-             patch('browser_use.mcp.server.BrowserSession', new_callable=_make_bs_mock):
+        with pytest.raises(RuntimeError, match='already exists'):
             await server._create_session(session_id='dup')
 
-            with pytest.raises(RuntimeError, match='already exists'):
-                await server._create_session(session_id='dup')
-
     @pytest.mark.asyncio
-    async def test_create_session_max_sessions_enforced(self):
+    async def test_create_session_max_sessions_enforced(self, server, patched_browser):
         """Exceeding max_sessions must raise RuntimeError."""
-        server = _make_server()
         server.max_sessions = 2
 
-        with patch.object(server, 'config', {}), \
-             patch('browser_use.mcp.server.get_default_profile', return_value={}), \
-             patch('browser_use.mcp.server.BrowserSession', new_callable=_make_bs_mock):
-            await server._create_session(session_id='s1')
-            await server._create_session(session_id='s2')
+        await server._create_session(session_id='s1')
+        await server._create_session(session_id='s2')
 
-            with pytest.raises(RuntimeError, match='Maximum sessions limit'):
-                await server._create_session(session_id='s3')
+        with pytest.raises(RuntimeError, match='Maximum sessions limit'):
+            await server._create_session(session_id='s3')
 
 
 # ===========================================================================
@@ -197,9 +226,8 @@ class TestSessionRetrieval:
     """Tests for _get_session."""
 
     @pytest.mark.asyncio
-    async def test_get_session_none_returns_default(self):
+    async def test_get_session_none_returns_default(self, server):
         """_get_session(None) returns the default session."""
-        server = _make_server()
         ss = _make_session_state(session_id='default')
         server.sessions['default'] = ss
         server.default_session_id = 'default'
@@ -208,9 +236,8 @@ class TestSessionRetrieval:
         assert result is ss
 
     @pytest.mark.asyncio
-    async def test_get_session_by_id(self):
+    async def test_get_session_by_id(self, server):
         """_get_session(session_id) returns the correct session."""
-        server = _make_server()
         ss_a = _make_session_state(session_id='a')
         ss_b = _make_session_state(session_id='b')
         server.sessions['a'] = ss_a
@@ -221,24 +248,18 @@ class TestSessionRetrieval:
         assert result is ss_b
 
     @pytest.mark.asyncio
-    async def test_get_session_invalid_id_raises(self):
+    async def test_get_session_invalid_id_raises(self, server):
         """_get_session with unknown ID must raise RuntimeError."""
-        server = _make_server()
-
         with pytest.raises(RuntimeError, match='not found'):
             await server._get_session('nonexistent')
 
     @pytest.mark.asyncio
-    async def test_get_session_creates_default_when_none_exists(self):
+    async def test_get_session_creates_default_when_none_exists(self, server, patched_browser):
         """_get_session(None) with no default creates a new session (backward compat)."""
-        server = _make_server()
         assert server.default_session_id is None
         assert len(server.sessions) == 0
 
-        with patch.object(server, 'config', {}), \
-             patch('browser_use.mcp.server.get_default_profile', return_value={}), \
-             patch('browser_use.mcp.server.BrowserSession', new_callable=_make_bs_mock):
-            result = await server._get_session(None)
+        result = await server._get_session(None)
 
         assert isinstance(result, SessionState)
         assert len(server.sessions) == 1
@@ -253,66 +274,18 @@ class TestSessionIsolation:
     """Tests for session isolation - each session gets its own objects."""
 
     @pytest.mark.asyncio
-    async def test_sessions_have_different_browser_sessions(self):
-        """Two sessions must have distinct browser_session instances."""
-        server = _make_server()
-
-        with patch.object(server, 'config', {}), \
-             patch('browser_use.mcp.server.get_default_profile', return_value={}), \
-             patch('browser_use.mcp.server.BrowserSession', new_callable=_make_bs_mock) as MockBS:
-                # Each call returns a new mock
-                MockBS.side_effect = [MagicMock(name='bs1', start=AsyncMock()), MagicMock(name='bs2', start=AsyncMock())]
-                await server._create_session(session_id='s1')
-                await server._create_session(session_id='s2')
-
-        bs1 = server.sessions['s1'].browser_session
-        bs2 = server.sessions['s2'].browser_session
-        assert bs1 is not bs2, "Sessions must have different browser_session objects"
-
-    @pytest.mark.asyncio
-    async def test_sessions_have_different_tools(self):
-        """Two sessions must have distinct Tools instances."""
-        server = _make_server()
-
-        with patch.object(server, 'config', {}), \
-             patch('browser_use.mcp.server.get_default_profile', return_value={}), \
-             patch('browser_use.mcp.server.BrowserSession', new_callable=_make_bs_mock):
-            await server._create_session(session_id='s1')
-            await server._create_session(session_id='s2')
-
-        t1 = server.sessions['s1'].tools
-        t2 = server.sessions['s2'].tools
-        assert t1 is not t2, "Sessions must have different Tools objects"
-
-    @pytest.mark.asyncio
-    async def test_sessions_have_different_file_systems(self):
-        """Two sessions must have distinct FileSystem instances."""
-        server = _make_server()
+    async def test_sessions_are_isolated(self, server, patched_browser):
+        """Two sessions must not share browser_session, Tools, FileSystem or lock instances."""
+        # Each call returns a new mock
+        patched_browser.side_effect = [MagicMock(name='bs1', start=AsyncMock()), MagicMock(name='bs2', start=AsyncMock())]
+        await server._create_session(session_id='s1')
+        await server._create_session(session_id='s2')
 
-        with patch.object(server, 'config', {}), \
-             patch('browser_use.mcp.server.get_default_profile', return_value={}), \
-             patch('browser_use.mcp.server.BrowserSession', new_callable=_make_bs_mock):
-            await server._create_session(session_id='s1')
-            await server._create_session(session_id='s2')
-
-        fs1 = server.sessions['s1'].file_system
-        fs2 = server.sessions['s2'].file_system
-        assert fs1 is not fs2, "Sessions must have different FileSystem objects"
-
-    @pytest.mark.asyncio
-    async def test_sessions_have_different_locks(self):
-        """Two sessions must have independent locks."""
-        server = _make_server()
-
-        with patch.object(server, 'config', {}), \
-             patch('browser_use.mcp.server.get_default_profile', return_value={}), \
-             patch('browser_use.mcp.server.BrowserSession', new_callable=_make_bs_mock):
-            await server._create_session(session_id='s1')
-            await server._create_session(session_id='s2')
-
-        lock1 = server.sessions['s1'].session_lock
-        lock2 = server.sessions['s2'].session_lock
-        assert lock1 is not lock2, "Sessions must have independent locks"
+        a, b = server.sessions['s1'], server.sessions['s2']
+        assert a.browser_session is not b.browser_session, "Sessions must have different browser_session objects"
+        assert a.tools is not b.tools, "Sessions must have different Tools objects"
+        assert a.file_system is not b.file_system, "Sessions must have different FileSystem objects"
+        assert a.session_lock is not b.session_lock, "Sessions must have independent locks"
 
 
 # ===========================================================================
@@ -322,47 +295,35 @@ class TestSessionIsolation:
 class TestSessionLifecycle:
     """Tests for session management: list, close (with and without session_id)."""
 
-    @pytest.mark.asyncio
-    async def test_list_sessions_returns_all(self):
-        """_list_sessions returns info for every session."""
-        server = _make_server()
+    def test_list_sessions_returns_all(self, server):
+        """_list_sessions_data returns info for every session."""
         server.sessions['a'] = _make_session_state(session_id='a')
         server.sessions['b'] = _make_session_state(session_id='b')
         server.default_session_id = 'a'
 
-        result = await server._list_sessions()
-        parsed = json.loads(result)
+        parsed = server._list_sessions_data()
 
         ids = {s['session_id'] for s in parsed}
         assert ids == {'a', 'b'}
 
     @pytest.mark.asyncio
-    async def test_list_sessions_empty(self):
+    async def test_list_sessions_empty(self, server):
         """_list_sessions with no sessions returns descriptive string."""
-        server = _make_server()
         result = await server._list_sessions()
         assert 'No active' in result
 
-    @pytest.mark.asyncio
-    async def test_list_sessions_marks_default(self):
-        """_list_sessions marks the default session."""
-        server = _make_server()
+    def test_list_sessions_marks_default(self, server):
+        """_list_sessions_data marks the default session."""
         server.sessions['a'] = _make_session_state(session_id='a')
         server.default_session_id = 'a'
 
-        result = await server._list_sessions()
-        parsed = json.loads(result)
+        parsed = server._list_sessions_data()
         assert parsed[0]['is_default'] is True
 
     @pytest.mark.asyncio
-    async def test_close_session_removes_from_dict(self):
+    async def test_close_session_removes_from_dict(self, populated_server):
         """_close_session removes the session from server.sessions."""
-        server = _make_server()
-        mock_bs = MagicMock()
-        mock_bs.start = AsyncMock()
-        mock_bs.stop = AsyncMock()
-        server.sessions['x'] = _make_session_state(session_id='x', browser_session=mock_bs)
-        server.default_session_id = 'x'
+        server = populated_server(['x'])
 
         result = await server._close_session('x')
 
@@ -370,15 +331,9 @@ class TestSessionLifecycle:
         assert 'Successfully closed' in result
 
     @pytest.mark.asyncio
-    async def test_close_session_reassigns_default(self):
+    async def test_close_session_reassigns_default(self, populated_server):
         """Closing the default session reassigns default to another session."""
-        server = _make_server()
-        mock_bs = MagicMock()
-        mock_bs.start = AsyncMock()
-        mock_bs.stop = AsyncMock()
-        server.sessions['a'] = _make_session_state(session_id='a', browser_session=mock_bs)
-        server.sessions['b'] = _make_session_state(session_id='b')
-        server.default_session_id = 'a'
+        server = populated_server(['a', 'b'])
 
         await server._close_session('a')
 
@@ -386,22 +341,15 @@ class TestSessionLifecycle:
         assert server.default_session_id == 'b'
 
     @pytest.mark.asyncio
-    async def test_close_session_not_found(self):
+    async def test_close_session_not_found(self, server):
         """_close_session with unknown ID returns error message (no exception)."""
-        server = _make_server()
         result = await server._close_session('ghost')
         assert 'not found' in result
 
     @pytest.mark.asyncio
-    async def test_close_session_no_args_lists_sessions(self):
+    async def test_close_session_no_args_lists_sessions(self, populated_server):
         """_close_session() without session_id returns list of active sessions."""
-        server = _make_server()
-        for sid in ('a', 'b', 'c'):
-            mock_bs = MagicMock()
-            mock_bs.start = AsyncMock()
-            mock_bs.stop = AsyncMock()
-            server.sessions[sid] = _make_session_state(session_id=sid, browser_session=mock_bs)
-        server.default_session_id = 'a'
+        server = populated_server(['a', 'b', 'c'])
 
         result = await server._close_session()
 
@@ -414,9 +362,8 @@ class TestSessionLifecycle:
         assert 'c' in result
 
     @pytest.mark.asyncio
-    async def test_close_session_no_args_empty(self):
+    async def test_close_session_no_args_empty(self, server):
         """_close_session() without session_id and no sessions returns descriptive string."""
-        server = _make_server()
         result = await server._close_session()
         assert 'No active' in result
 
@@ -426,74 +373,54 @@ class TestSessionLifecycle:
 # ===========================================================================
 
 
+_LIST_TOOLS_REQUEST = types.ListToolsRequest(method='tools/list')
+
+
 async def _get_registered_tools(server: BrowserUseServer):
     """Invoke the registered list_tools handler to get tool definitions."""
-    import mcp.types as types
-
     handler = server.server.request_handlers[types.ListToolsRequest]
-    result = await handler(types.ListToolsRequest(method='tools/list'))
+    result = await handler(_LIST_TOOLS_REQUEST)
     return result.root.tools
 
 
+@pytest.fixture(scope='module')
+async def registered_tools(_base_server: BrowserUseServer):
+    """Tool definitions from the list_tools handler, fetched once per module."""
+    return await _get_registered_tools(_base_server)
+
+
+# Session management tools take session_id as their own argument, not as routing
+_SESSION_MGMT_TOOLS = frozenset({'browser_create_session', 'browser_list_sessions', 'browser_close_session'})
+
+
 class TestToolSchema:
     """Tests for tool schema - session_id in inputSchema."""
 
     @pytest.mark.asyncio
-    async def test_browser_tools_have_session_id_in_schema(self):
-        """All browser_ tools (except session management) must have session_id property."""
-        server = _make_server()
-        tools = await _get_registered_tools(server)
-
-        # Tools that should have session_id
-        session_mgmt = {
-            'browser_create_session', 'browser_list_sessions',
-            'browser_close_session',
-        }
-        browser_tools_with_session = [
-            t for t in tools
-            if t.name.startswith('browser_') and t.name not in session_mgmt
-        ]
-
-        assert len(browser_tools_with_session) > 0, "Should have browser_ tools to test"
+    async def test_tool_schema_session_id(self, registered_tools):
+        """Routed browser_ tools take an optional session_id; session management tools are registered."""
+        mgmt_tools = set()
+        routed_count = 0
 
-        for tool in browser_tools_with_session:
+        for tool in registered_tools:
+            if tool.name in _SESSION_MGMT_TOOLS:
+                mgmt_tools.add(tool.name)
+                continue
+            if not tool.name.startswith('browser_'):
+                continue
+            routed_count += 1
             props = tool.inputSchema.get('properties', {})
+            required = tool.inputSchema.get('required', [])
             assert 'session_id' in props, (
                 f"Tool '{tool.name}' missing session_id in schema properties"
             )
-
-    @pytest.mark.asyncio
-    async def test_session_id_is_optional_in_schema(self):
-        """session_id must NOT be in 'required' for any browser_ tool."""
-        server = _make_server()
-        tools = await _get_registered_tools(server)
-
-        session_mgmt = {
-            'browser_create_session', 'browser_list_sessions',
-            'browser_close_session',
-        }
-        browser_tools_with_session = [
-            t for t in tools
-            if t.name.startswith('browser_') and t.name not in session_mgmt
-        ]
-
-        for tool in browser_tools_with_session:
-            required = tool.inputSchema.get('required', [])
             assert 'session_id' not in required, (
                 f"Tool '{tool.name}' has session_id in required - must be optional"
             )
 
-    @pytest.mark.asyncio
-    async def test_session_management_tools_exist(self):
-        """Session management tools must be registered."""
-        server = _make_server()
-        tools = await _get_registered_tools(server)
-        tool_names = {t.name for t in tools}
+        assert routed_count > 0, "Should have browser_ tools to test"
+        assert mgmt_tools == _SESSION_MGMT_TOOLS
 
-        assert 'browser_create_session' in tool_names
-        assert 'browser_list_sessions' in tool_names
-        assert 'browser_close_session' in tool_names
-        
 
 # ===========================================================================
 # 7. Backward compatibility
@@ -503,23 +430,10 @@ class TestBackwardCompatibility:
     """Tests for backward compatibility - tools work without session_id."""
 
     @pytest.mark.asyncio
-    async def test_execute_tool_without_session_id_uses_default(self):
+    async def test_execute_tool_without_session_id_uses_default(self, server):
         """Calling a browser_ tool without session_id uses the default session."""
-        server = _make_server()
-
         # Pre-populate a default session
-        mock_bs = MagicMock()
-        mock_bs.start = AsyncMock()
-        mock_bs.event_bus = MagicMock()
-        mock_bs.get_current_page_url = AsyncMock(return_value='https://example.com')
-
-        class AwaitableEvent:
-            def __await__(self):
-                return iter([])
-            async def event_result(self, **kwargs):
-                return None
-
-        mock_bs.event_bus.dispatch = MagicMock(return_value=AwaitableEvent())
+        mock_bs = _make_mock_bs('https://example.com')
 
         ss = _make_session_state(session_id='default', browser_session=mock_bs)
         server.sessions['default'] = ss
@@ -531,29 +445,14 @@ class TestBackwardCompatibility:
         assert 'example.com' in result
 
     @pytest.mark.asyncio
-    async def test_execute_tool_auto_creates_default_session(self):
+    async def test_execute_tool_auto_creates_default_session(self, server, patched_browser):
         """First tool call without session_id auto-creates a default session."""
-        server = _make_server()
         assert len(server.sessions) == 0
 
-        # Mock _create_session to avoid real browser launch
-        mock_bs = MagicMock()
-        mock_bs.start = AsyncMock()
-        mock_bs.event_bus = MagicMock()
-        mock_bs.get_current_page_url = AsyncMock(return_value='https://example.com')
-
-        class AwaitableEvent:
-            def __await__(self):
-                return iter([])
-            async def event_result(self, **kwargs):
-                return None
-
-        mock_bs.event_bus.dispatch = MagicMock(return_value=AwaitableEvent())
+        mock_bs = _make_mock_bs('https://example.com')
 
-        with patch.object(server, 'config', {}), \
-             patch('browser_use.mcp.server.get_default_profile', return_value={}), \
-             patch('browser_use.mcp.server.BrowserSession', return_value=mock_bs):
-            result = await server._execute_tool('browser_navigate', {'url': 'https://example.com'})
+        patched_browser.return_value = mock_bs
+        await server._execute_tool('browser_navigate', {'url': 'https://example.com'})
 
         # A default session should have been created
         assert len(server.sessions) == 1
@@ -568,31 +467,16 @@ class TestSessionRouting:
     """Tests for session routing in _execute_tool."""
 
     @pytest.mark.asyncio
-    async def test_session_id_extracted_from_arguments(self):
+    async def test_session_id_extracted_from_arguments(self, server):
         """_execute_tool extracts session_id from arguments and routes correctly."""
-        server = _make_server()
-
         # Create two sessions with mock browser_sessions
-        mock_bs_a = MagicMock(name='bs_a')
-        mock_bs_a.event_bus = MagicMock()
-        mock_bs_a.get_current_page_url = AsyncMock(return_value='https://a.com')
-
-        class AwaitableEvent:
-            def __await__(self):
-                return iter([])
-            async def event_result(self, **kwargs):
-                return None
-
-        mock_bs_a.event_bus.dispatch = MagicMock(return_value=AwaitableEvent())
+        mock_bs_a = _make_mock_bs('https://a.com', name='bs_a')
 
         ss_a = _make_session_state(session_id='sess-a', browser_session=mock_bs_a)
         server.sessions['sess-a'] = ss_a
         server.default_session_id = 'sess-a'
 
-        mock_bs_b = MagicMock(name='bs_b')
-        mock_bs_b.event_bus = MagicMock()
-        mock_bs_b.get_current_page_url = AsyncMock(return_value='https://b.com')
-        mock_bs_b.event_bus.dispatch = MagicMock(return_value=AwaitableEvent())
+        mock_bs_b = _make_mock_bs('https://b.com', name='bs_b')
 
         ss_b = _make_session_state(session_id='sess-b', browser_session=mock_bs_b)
         server.sessions['sess-b'] = ss_b
@@ -608,22 +492,9 @@ class TestSessionRouting:
         mock_bs_a.event_bus.dispatch.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_session_id_not_passed_to_tool_method(self):
+    async def test_session_id_not_passed_to_tool_method(self, server):
         """session_id must be popped from arguments - not forwarded to tool methods."""
-        server = _make_server()
-
-        mock_bs = MagicMock()
-        mock_bs.start = AsyncMock()
-        mock_bs.event_bus = MagicMock()
-        mock_bs.get_current_page_url = AsyncMock(return_value='https://example.com')
-
-        class AwaitableEvent:
-            def __await__(self):
-                return iter([])
-            async def event_result(self, **kwargs):
-                return None
-
-        mock_bs.event_bus.dispatch = MagicMock(return_value=AwaitableEvent())
+        mock_bs = _make_mock_bs('https://example.com')
 
         ss = _make_session_state(session_id='s1', browser_session=mock_bs)
         server.sessions['s1'] = ss
@@ -637,74 +508,75 @@ class TestSessionRouting:
         assert 'session_id' not in args
 
     @pytest.mark.asyncio
-    async def test_session_management_tools_bypass_routing(self):
+    async def test_session_management_tools_bypass_routing(self, server):
         """Session management tools (list, close, create) don't go through session routing."""
-        server = _make_server()
-
         # browser_list_sessions should work with no sessions
         result = await server._execute_tool('browser_list_sessions', {})
         assert 'No active' in result
 
     @pytest.mark.asyncio
-    async def test_execute_tool_inner_dispatches_to_correct_methods(self):
+    @pytest.mark.parametrize(
+        'tool_name, method_name, arguments, expected_args',
+        [
+            ('browser_navigate', '_navigate', {'url': 'https://x.com'}, ('https://x.com', False)),
+            ('browser_go_back', '_go_back', {}, ()),
+        ],
+        ids=['navigate', 'go_back'],
+    )
+    async def test_execute_tool_inner_dispatches_to_correct_methods(
+        self, server, tool_name, method_name, arguments, expected_args
+    ):
         """_execute_tool_inner routes tool names to the correct session-aware methods."""
-        server = _make_server()
         ss = _make_session_state(session_id='test')
 
-        # Patch individual tool methods to verify dispatch
-        with patch.object(server, '_navigate', new_callable=AsyncMock, return_value='nav ok') as mock_nav:
-            result = await server._execute_tool_inner(
-                'browser_navigate', {'url': 'https://x.com'}, ss
-            )
-            mock_nav.assert_called_once_with('https://x.com', False, session=ss)
-            assert result == 'nav ok'
+        with patch.object(server, method_name, new_callable=AsyncMock, return_value='ok') as mock_method:
+            result = await server._execute_tool_inner(tool_name, arguments, ss)
 
-        with patch.object(server, '_go_back', new_callable=AsyncMock, return_value='back ok') as mock_back:
-            result = await server._execute_tool_inner('browser_go_back', {}, ss)
-            mock_back.assert_called_once_with(session=ss)
-            assert result == 'back ok'
+        mock_method.assert_called_once_with(*expected_args, session=ss)
+        assert result == 'ok'
 
     @pytest.mark.asyncio
-    async def test_execute_tool_unknown_returns_error(self):
+    async def test_execute_tool_unknown_returns_error(self, server):
         """Unknown tool name returns error string."""
-        server = _make_server()
         result = await server._execute_tool('totally_unknown_tool', {})
         assert 'Unknown tool' in result
 
     @pytest.mark.asyncio
-    async def test_session_lock_acquired_during_tool_execution(self):
+    async def test_session_lock_acquired_during_tool_execution(self, server):
         """Tool execution acquires the session lock for concurrency safety."""
-        server = _make_server()
-
-        mock_bs = MagicMock()
-        mock_bs.start = AsyncMock()
-        mock_bs.event_bus = MagicMock()
-        mock_bs.get_current_page_url = AsyncMock(return_value='https://example.com')
-
-        class AwaitableEvent:
-            def __await__(self):
-                return iter([])
-            async def event_result(self, **kwargs):
-                return None
-
-        mock_bs.event_bus.dispatch = MagicMock(return_value=AwaitableEvent())
-
         session_lock = asyncio.Lock()
-        ss = _make_session_state(session_id='locked', browser_session=mock_bs, session_lock=session_lock)
+        ss = _make_session_state(session_id='locked', session_lock=session_lock)
         server.sessions['locked'] = ss
         server.default_session_id = 'locked'
 
-        # Acquire the lock externally - tool execution should block
-        async with session_lock:
-            # Start tool execution in background - it should be blocked by the lock
-            task = asyncio.create_task(
-                server._execute_tool('browser_navigate', {'url': 'https://example.com'})
-            )
-            # Give the event loop a chance to schedule the task
-            await asyncio.sleep(0.05)
-            # Task should NOT be done because lock is held
-            assert not task.done(), "Tool execution should be blocked by session lock"
-
-        # After releasing lock, task should complete
-        result = await asyncio.wait_for(task, timeout=2.0)
+        routed = asyncio.Event()
+        started = asyncio.Event()
+        real_get_session = server._get_session
+
+        async def get_session(session_id):
+            # Routing is the last step before _execute_tool takes the session lock
+            session = await real_get_session(session_id)
+            routed.set()
+            return session
+
+        async def execute_inner(tool_name, arguments, session):
+            started.set()
+            return 'Navigated to https://example.com'
+
+        with patch.object(server, '_get_session', side_effect=get_session), \
+             patch.object(server, '_execute_tool_inner', side_effect=execute_inner):
+            # Acquire the lock externally - tool execution should block
+            async with session_lock:
+                task = asyncio.create_task(
+                    server._execute_tool('browser_navigate', {'url': 'https://example.com'})
+                )
+                # Once routing is done the task goes straight to the lock and parks there
+                await routed.wait()
+                assert not started.is_set(), "Tool execution should be blocked by session lock"
+                assert not task.done()
+
+            # After releasing lock, the inner dispatch runs and the task completes
+            result = await task
+
+        assert started.is_set()
         assert 'example.com' in result
@@ -1,10 +1,12 @@
 """Tests for the pattern learning system."""
 
+import functools
 import json
-import tempfile
+from dataclasses import dataclass
 from datetime import date
 from pathlib import Path
-from unittest.mock import MagicMock
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
@@ -20,118 +22,166 @@ from browser_use.agent.pattern_learning import (
 	WorkflowPattern,
 	WorkflowStep,
 )
-from browser_use.filesystem.file_system import FileSystem, JsonFile
+from browser_use.agent.service import Agent
+from browser_use.filesystem.file_system import JsonFile
+from browser_use.llm.views import ChatInvokeCompletion
 from tests.ci.conftest import create_mock_llm
 
 
+@functools.cache
+def _shared_mock_llm():
+	"""One mock LLM for the whole module: no test here drives the agent loop, so its action sequence is never consumed."""
+	return create_mock_llm()
+
+
+# Static JSON payloads, encoded once at import
+_V1_PATTERNS_JSON = json.dumps(
+	{
+		'version': 1,
+		'patterns': {
+			'example.com': {
+				'cookie_consent': {
+					'actions': ["click 'Accept'"],
+					'last_success': '2024-01-15',
+				}
+			}
+		},
+	}
+)
+_EMPTY_V1_PATTERNS_JSON = '{"version": 1, "patterns": {}}'
+_MISSING_ACTIONS_JSON = json.dumps(
+	{
+		'version': 1,
+		'patterns': {
+			'example.com': {
+				'cookie_consent': {
+					'last_success': '2024-01-15',
+					# 'actions' is missing
+				}
+			}
+		},
+	}
+)
+_NEW_SITE_SESSION_JSON = json.dumps(
+	{
+		'version': 1,
+		'patterns': {
+			'newsite.com': {
+				'cookie_consent': {
+					'actions': ["click 'Accept'"],
+					'last_success': None,
+				}
+			}
+		},
+	}
+)
+_EXAMPLE_SESSION_JSON = json.dumps(
+	{
+		'version': 2,
+		'patterns': {
+			'example.com': {
+				'cookie_consent': {'actions': ["click 'Accept'"], 'last_success': None},
+			}
+		},
+	}
+)
+_UPDATED_SESSION_JSON = json.dumps(
+	{
+		'version': 1,
+		'patterns': {
+			'example.com': {
+				'cookie_consent': {
+					'actions': ['new action'],
+					'last_success': None,
+				}
+			}
+		},
+	}
+)
+
+
+@pytest.fixture(scope='module')
+def v1_patterns_path(tmp_path_factory) -> Path:
+	"""A v1 patterns.json (no workflows key) written once; tests must only read it."""
+	path = tmp_path_factory.mktemp('v1_patterns') / 'patterns.json'
+	path.write_text(_V1_PATTERNS_JSON)
+	return path
+
+
 class TestPatternStore:
 	"""Tests for PatternStore class."""
 
-	def test_load_missing_file_returns_empty(self):
+	def test_load_missing_file_returns_empty(self, tmp_path):
 		"""Loading from non-existent file returns empty PatternFile."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			store = PatternStore(Path(tmp_dir) / 'nonexistent.json')
-			result = store.load()
+		store = PatternStore(tmp_path / 'nonexistent.json')
+		result = store.load()
 
-			assert isinstance(result, PatternFile)
-			assert result.version == 2
-			assert result.patterns == {}
-			assert result.workflows == {}
+		assert isinstance(result, PatternFile)
+		assert result.version == 2
+		assert result.patterns == {}
+		assert result.workflows == {}
 
-	def test_load_valid_json(self):
+	def test_load_valid_json(self, v1_patterns_path):
 		"""Loading valid JSON file returns PatternFile with data."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			path = Path(tmp_dir) / 'patterns.json'
-			data = {
-				'version': 1,
-				'patterns': {
-					'example.com': {
-						'cookie_consent': {
-							'actions': ["click 'Accept'"],
-							'last_success': '2024-01-15',
-						}
-					}
-				},
-			}
-			path.write_text(json.dumps(data))
-
-			store = PatternStore(path)
-			result = store.load()
+		store = PatternStore(v1_patterns_path)
+		result = store.load()
 
-			assert result.version == 1
-			assert 'example.com' in result.patterns
-			assert result.patterns['example.com']['cookie_consent'].actions == ["click 'Accept'"]
+		assert result.version == 1
+		assert 'example.com' in result.patterns
+		assert result.patterns['example.com']['cookie_consent'].actions == ["click 'Accept'"]
 
-	def test_load_invalid_json_raises(self):
+	def test_load_invalid_json_raises(self, tmp_path):
 		"""Loading invalid JSON raises ValueError."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			path = Path(tmp_dir) / 'patterns.json'
-			path.write_text('not valid json {{{')
+		path = tmp_path / 'patterns.json'
+		path.write_text('not valid json {{{')
 
-			store = PatternStore(path)
-			with pytest.raises(ValueError, match='Invalid JSON'):
-				store.load()
+		store = PatternStore(path)
+		with pytest.raises(ValueError, match='Invalid JSON'):
+			store.load()
 
-	def test_load_invalid_schema_raises(self):
+	def test_load_invalid_schema_raises(self, tmp_path):
 		"""Loading JSON with invalid schema raises ValueError."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			path = Path(tmp_dir) / 'patterns.json'
-			# Missing required 'actions' field in pattern entry
-			data = {
-				'version': 1,
-				'patterns': {
-					'example.com': {
-						'cookie_consent': {
-							'last_success': '2024-01-15',
-							# 'actions' is missing
-						}
-					}
-				},
-			}
-			path.write_text(json.dumps(data))
+		path = tmp_path / 'patterns.json'
+		# Missing required 'actions' field in pattern entry
+		path.write_text(_MISSING_ACTIONS_JSON)
 
-			store = PatternStore(path)
-			with pytest.raises(ValueError, match='Invalid patterns file schema'):
-				store.load()
+		store = PatternStore(path)
+		with pytest.raises(ValueError, match='Invalid patterns file schema'):
+			store.load()
 
-	def test_save_creates_directories(self):
+	def test_save_creates_directories(self, tmp_path):
 		"""Save creates parent directories if they don't exist."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			path = Path(tmp_dir) / 'nested' / 'deep' / 'patterns.json'
-			store = PatternStore(path)
+		path = tmp_path / 'nested' / 'deep' / 'patterns.json'
+		store = PatternStore(path)
 
-			data = PatternFile(patterns={'test.com': {'login': PatternEntry(actions=['click login'])}})
-			store.save(data)
+		data = PatternFile(patterns={'test.com': {'login': PatternEntry(actions=['click login'])}})
+		store.save(data)
 
-			assert path.exists()
-			assert path.parent.exists()
+		assert path.exists()
+		assert path.parent.exists()
 
-	def test_save_roundtrip(self):
+	def test_save_roundtrip(self, tmp_path):
 		"""Data saved can be loaded back correctly."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			path = Path(tmp_dir) / 'patterns.json'
-			store = PatternStore(path)
-
-			original = PatternFile(
-				version=1,
-				patterns={
-					'amazon.com': {
-						'cookie_consent': PatternEntry(actions=["click 'Accept All'"], last_success='2024-01-15'),
-						'search_box': PatternEntry(actions=['type query', 'press Enter']),
-					},
-					'_global': {
-						'modal_close': PatternEntry(actions=["click 'X' or 'Close'"]),
-					},
+		path = tmp_path / 'patterns.json'
+		store = PatternStore(path)
+
+		original = PatternFile(
+			version=1,
+			patterns={
+				'amazon.com': {
+					'cookie_consent': PatternEntry(actions=["click 'Accept All'"], last_success='2024-01-15'),
+					'search_box': PatternEntry(actions=['type query', 'press Enter']),
 				},
-			)
+				'_global': {
+					'modal_close': PatternEntry(actions=["click 'X' or 'Close'"]),
+				},
+			},
+		)
 
-			store.save(original)
-			loaded = store.load()
+		store.save(original)
+		loaded = store.load()
 
-			assert loaded.version == original.version
-			assert loaded.patterns.keys() == original.patterns.keys()
-			assert loaded.patterns['amazon.com']['cookie_consent'].actions == ["click 'Accept All'"]
-			assert loaded.patterns['_global']['modal_close'].actions == ["click 'X' or 'Close'"]
+		assert loaded.model_dump() == original.model_dump()
 
 	@pytest.mark.parametrize(
 		'url,expected',
@@ -149,369 +199,302 @@ class TestPatternStore:
 		assert PatternStore.normalize_domain(url) == expected
 
 
+def _session_file_system(session_content: str | None = None) -> SimpleNamespace:
+	"""Stand-in for the agent FileSystem: merge_from_session only reads its files dict."""
+	files = {}
+	if session_content is not None:
+		files[SESSION_PATTERNS_FILENAME] = JsonFile(name='session_patterns', content=session_content)
+	return SimpleNamespace(files=files)
+
+
 class TestPatternStoreMerge:
 	"""Tests for PatternStore.merge_from_session()."""
 
-	def test_merge_adds_new_patterns(self):
+	def test_merge_adds_new_patterns(self, tmp_path):
 		"""Merge adds patterns from session to persistent storage."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			patterns_path = Path(tmp_dir) / 'patterns.json'
-			store = PatternStore(patterns_path)
-
-			# Create mock FileSystem with session patterns
-			file_system = FileSystem(tmp_dir)
-			session_data = {
-				'version': 1,
-				'patterns': {
-					'newsite.com': {
-						'cookie_consent': {
-							'actions': ["click 'Accept'"],
-							'last_success': None,
-						}
-					}
-				},
-			}
-			file_system.files[SESSION_PATTERNS_FILENAME] = JsonFile(name='session_patterns', content=json.dumps(session_data))
+		patterns_path = tmp_path / 'patterns.json'
+		store = PatternStore(patterns_path)
+
+		# Create mock FileSystem with session patterns
+		file_system = _session_file_system(_NEW_SITE_SESSION_JSON)
 
-			count = store.merge_from_session(file_system)
+		count = store.merge_from_session(file_system)
 
-			assert count == 1
-			loaded = store.load()
-			assert 'newsite.com' in loaded.patterns
-			assert loaded.patterns['newsite.com']['cookie_consent'].last_success == date.today().isoformat()
+		assert count == 1
+		loaded = store.load()
+		assert 'newsite.com' in loaded.patterns
+		assert loaded.patterns['newsite.com']['cookie_consent'].last_success == date.today().isoformat()
 
-	def test_merge_updates_existing_patterns(self):
+	def test_merge_updates_existing_patterns(self, tmp_path):
 		"""Merge updates existing patterns with new data."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			patterns_path = Path(tmp_dir) / 'patterns.json'
-			store = PatternStore(patterns_path)
-
-			# Create existing patterns
-			existing = PatternFile(
-				patterns={
-					'example.com': {
-						'cookie_consent': PatternEntry(actions=['old action'], last_success='2024-01-01'),
-					}
+		patterns_path = tmp_path / 'patterns.json'
+		store = PatternStore(patterns_path)
+
+		# Create existing patterns
+		existing = PatternFile(
+			patterns={
+				'example.com': {
+					'cookie_consent': PatternEntry(actions=['old action'], last_success='2024-01-01'),
 				}
-			)
-			store.save(existing)
-
-			# Create mock FileSystem with updated session patterns
-			file_system = FileSystem(tmp_dir)
-			session_data = {
-				'version': 1,
-				'patterns': {
-					'example.com': {
-						'cookie_consent': {
-							'actions': ['new action'],
-							'last_success': None,
-						}
-					}
-				},
 			}
-			file_system.files[SESSION_PATTERNS_FILENAME] = JsonFile(name='session_patterns', content=json.dumps(session_data))
+		)
+		store.save(existing)
+
+		# Create mock FileSystem with updated session patterns
+		file_system = _session_file_system(_UPDATED_SESSION_JSON)
 
-			count = store.merge_from_session(file_system)
+		count = store.merge_from_session(file_system)
 
-			assert count == 1
-			loaded = store.load()
-			assert loaded.patterns['example.com']['cookie_consent'].actions == ['new action']
-			assert loaded.patterns['example.com']['cookie_consent'].last_success == date.today().isoformat()
+		assert count == 1
+		loaded = store.load()
+		assert loaded.patterns['example.com']['cookie_consent'].actions == ['new action']
+		assert loaded.patterns['example.com']['cookie_consent'].last_success == date.today().isoformat()
 
-	def test_merge_no_session_file_returns_zero(self):
+	def test_merge_no_session_file_returns_zero(self, tmp_path):
 		"""Merge returns 0 when no session_patterns.json exists."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			patterns_path = Path(tmp_dir) / 'patterns.json'
-			store = PatternStore(patterns_path)
+		patterns_path = tmp_path / 'patterns.json'
+		store = PatternStore(patterns_path)
 
-			# Create mock FileSystem without session patterns
-			file_system = FileSystem(tmp_dir)
+		# Create mock FileSystem without session patterns
+		file_system = _session_file_system()
 
-			count = store.merge_from_session(file_system)
+		count = store.merge_from_session(file_system)
 
-			assert count == 0
+		assert count == 0
 
-	def test_merge_invalid_session_json_returns_zero(self):
+	def test_merge_invalid_session_json_returns_zero(self, tmp_path):
 		"""Merge returns 0 and logs warning for invalid session JSON."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			patterns_path = Path(tmp_dir) / 'patterns.json'
-			store = PatternStore(patterns_path)
+		patterns_path = tmp_path / 'patterns.json'
+		store = PatternStore(patterns_path)
 
-			# Create mock FileSystem with invalid JSON
-			file_system = FileSystem(tmp_dir)
-			file_system.files[SESSION_PATTERNS_FILENAME] = JsonFile(name='session_patterns', content='not valid json')
+		# Create mock FileSystem with invalid JSON
+		file_system = _session_file_system('not valid json')
 
-			count = store.merge_from_session(file_system)
+		count = store.merge_from_session(file_system)
 
-			assert count == 0
+		assert count == 0
 
-	def test_merge_empty_session_file_returns_zero(self):
+	def test_merge_empty_session_file_returns_zero(self, tmp_path):
 		"""Merge returns 0 for empty session file."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			patterns_path = Path(tmp_dir) / 'patterns.json'
-			store = PatternStore(patterns_path)
+		patterns_path = tmp_path / 'patterns.json'
+		store = PatternStore(patterns_path)
 
-			# Create mock FileSystem with empty content
-			file_system = FileSystem(tmp_dir)
-			file_system.files[SESSION_PATTERNS_FILENAME] = JsonFile(name='session_patterns', content='   ')
+		# Create mock FileSystem with empty content
+		file_system = _session_file_system('   ')
 
-			count = store.merge_from_session(file_system)
+		count = store.merge_from_session(file_system)
 
-			assert count == 0
+		assert count == 0
+
+
+@pytest.fixture(scope='module')
+def default_pattern_agent(tmp_path_factory):
+	"""One PatternLearningAgent with default options, shared by the tests that only inspect it."""
+	return PatternLearningAgent(
+		task='Test task',
+		llm=_shared_mock_llm(),
+		patterns_path=tmp_path_factory.mktemp('patterns') / 'patterns.json',
+	)
 
 
 class TestPatternLearningAgent:
 	"""Tests for PatternLearningAgent class."""
 
-	def test_init_creates_agent_with_instructions(self):
+	def test_init_creates_agent_with_instructions(self, default_pattern_agent):
 		"""PatternLearningAgent injects PATTERN_LEARNING_INSTRUCTIONS into agent."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			mock_llm = create_mock_llm()
-
-			agent = PatternLearningAgent(
-				task='Test task',
-				llm=mock_llm,
-				patterns_path=Path(tmp_dir) / 'patterns.json',
-			)
+		# Check that instructions are in the agent's settings
+		assert '<pattern_learning>' in default_pattern_agent._agent.settings.extend_system_message
 
-			# Check that instructions are in the agent's settings
-			assert '<pattern_learning>' in agent._agent.settings.extend_system_message
-
-	def test_init_adds_patterns_to_available_paths(self):
+	def test_init_adds_patterns_to_available_paths(self, tmp_path):
 		"""PatternLearningAgent adds existing patterns file to available_file_paths."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			patterns_path = Path(tmp_dir) / 'patterns.json'
-			# Create the patterns file so it gets added to available paths
-			patterns_path.write_text('{"version": 1, "patterns": {}}')
+		patterns_path = tmp_path / 'patterns.json'
+		# Create the patterns file so it gets added to available paths
+		patterns_path.write_text(_EMPTY_V1_PATTERNS_JSON)
 
-			mock_llm = create_mock_llm()
+		mock_llm = _shared_mock_llm()
 
-			agent = PatternLearningAgent(
-				task='Test task',
-				llm=mock_llm,
-				patterns_path=patterns_path,
-			)
+		agent = PatternLearningAgent(
+			task='Test task',
+			llm=mock_llm,
+			patterns_path=patterns_path,
+		)
 
-			# Check that patterns path is in available_file_paths
-			assert str(patterns_path) in agent._agent.available_file_paths
+		# Check that patterns path is in available_file_paths
+		assert str(patterns_path) in agent._agent.available_file_paths
 
-	def test_init_preserves_user_available_paths(self):
+	def test_init_preserves_user_available_paths(self, tmp_path):
 		"""PatternLearningAgent preserves user-provided available_file_paths."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			patterns_path = Path(tmp_dir) / 'patterns.json'
-			patterns_path.write_text('{"version": 1, "patterns": {}}')
-			user_path = '/some/user/file.txt'
-
-			mock_llm = create_mock_llm()
-
-			agent = PatternLearningAgent(
-				task='Test task',
-				llm=mock_llm,
-				patterns_path=patterns_path,
-				available_file_paths=[user_path],
-			)
+		patterns_path = tmp_path / 'patterns.json'
+		patterns_path.write_text(_EMPTY_V1_PATTERNS_JSON)
+		user_path = '/some/user/file.txt'
 
-			# Check both paths are present
-			assert str(patterns_path) in agent._agent.available_file_paths
-			assert user_path in agent._agent.available_file_paths
+		mock_llm = _shared_mock_llm()
 
-	def test_getattr_delegates_to_agent(self):
-		"""PatternLearningAgent delegates attribute access to inner Agent."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			mock_llm = create_mock_llm()
+		agent = PatternLearningAgent(
+			task='Test task',
+			llm=mock_llm,
+			patterns_path=patterns_path,
+			available_file_paths=[user_path],
+		)
 
-			agent = PatternLearningAgent(
-				task='Test task for delegation',
-				llm=mock_llm,
-				patterns_path=Path(tmp_dir) / 'patterns.json',
-			)
+		# Check both paths are present
+		assert str(patterns_path) in agent._agent.available_file_paths
+		assert user_path in agent._agent.available_file_paths
 
-			# Access delegated attributes
-			assert agent.task == 'Test task for delegation'
-			assert hasattr(agent, 'history')
-			assert hasattr(agent, 'file_system')
+	def test_getattr_delegates_to_agent(self, default_pattern_agent):
+		"""PatternLearningAgent delegates attribute access to inner Agent."""
+		# Access delegated attributes
+		assert default_pattern_agent.task == 'Test task'
+		assert hasattr(default_pattern_agent, 'history')
+		assert hasattr(default_pattern_agent, 'file_system')
 
-	def test_user_extend_message_preserved(self):
+	def test_user_extend_message_preserved(self, tmp_path):
 		"""User's extend_system_message is appended after pattern instructions."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			mock_llm = create_mock_llm()
-			user_message = 'Custom user instructions here'
-
-			agent = PatternLearningAgent(
-				task='Test task',
-				llm=mock_llm,
-				patterns_path=Path(tmp_dir) / 'patterns.json',
-				extend_system_message=user_message,
-			)
+		mock_llm = _shared_mock_llm()
+		user_message = 'Custom user instructions here'
 
-			# Check both pattern instructions and user message are present
-			combined = agent._agent.settings.extend_system_message
-			assert '<pattern_learning>' in combined
-			assert user_message in combined
-			# User message should come after pattern instructions
-			assert combined.index('<pattern_learning>') < combined.index(user_message)
-
-	def test_save_patterns_returns_int(self):
-		"""save_patterns() returns integer count."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			mock_llm = create_mock_llm()
+		agent = PatternLearningAgent(
+			task='Test task',
+			llm=mock_llm,
+			patterns_path=tmp_path / 'patterns.json',
+			extend_system_message=user_message,
+		)
 
-			agent = PatternLearningAgent(
-				task='Test task',
-				llm=mock_llm,
-				patterns_path=Path(tmp_dir) / 'patterns.json',
-			)
+		# Check both pattern instructions and user message are present
+		combined = agent._agent.settings.extend_system_message
+		assert '<pattern_learning>' in combined
+		assert user_message in combined
+		# User message should come after pattern instructions
+		assert combined.index('<pattern_learning>') < combined.index(user_message)
 
-			# No session patterns, should return 0
-			count = agent.save_patterns()
-			assert isinstance(count, int)
-			assert count == 0
+	def test_save_patterns_returns_int(self, default_pattern_agent):
+		"""save_patterns() returns integer count."""
+		# No session patterns, should return 0
+		count = default_pattern_agent.save_patterns()
+		assert isinstance(count, int)
+		assert count == 0
 
-	def test_patterns_path_property(self):
+	def test_patterns_path_property(self, tmp_path):
 		"""patterns_path property returns correct Path."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			patterns_path = Path(tmp_dir) / 'my_patterns.json'
-			mock_llm = create_mock_llm()
-
-			agent = PatternLearningAgent(
-				task='Test task',
-				llm=mock_llm,
-				patterns_path=patterns_path,
-			)
-
-			assert agent.patterns_path == patterns_path.resolve()
-
-	def test_agent_property(self):
-		"""agent property returns inner Agent instance."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			mock_llm = create_mock_llm()
+		patterns_path = tmp_path / 'my_patterns.json'
+		mock_llm = _shared_mock_llm()
 
-			agent = PatternLearningAgent(
-				task='Test task',
-				llm=mock_llm,
-				patterns_path=Path(tmp_dir) / 'patterns.json',
-			)
+		agent = PatternLearningAgent(
+			task='Test task',
+			llm=mock_llm,
+			patterns_path=patterns_path,
+		)
 
-			from browser_use.agent.service import Agent
+		assert agent.patterns_path == patterns_path.resolve()
 
-			assert isinstance(agent.agent, Agent)
-			assert agent.agent is agent._agent
+	def test_agent_property(self, default_pattern_agent):
+		"""agent property returns inner Agent instance."""
+		assert isinstance(default_pattern_agent.agent, Agent)
+		assert default_pattern_agent.agent is default_pattern_agent._agent
+
+
+_REQUIRED_INSTRUCTION_TOKENS = (
+	# Wrapping XML tags
+	'<pattern_learning>',
+	'</pattern_learning>',
+	# Required sections
+	'READING PATTERNS',
+	'APPLYING KNOWN PATTERNS',
+	'DISCOVERING NEW PATTERNS',
+	'WHAT TO RECORD',
+	'WHAT NOT TO RECORD',
+	# File the agent writes discoveries to
+	'session_patterns.json',
+)
 
 
 class TestPatternLearningInstructions:
 	"""Tests for PATTERN_LEARNING_INSTRUCTIONS constant."""
 
-	def test_instructions_contain_xml_tags(self):
-		"""Instructions are wrapped in <pattern_learning> tags."""
-		assert '<pattern_learning>' in PATTERN_LEARNING_INSTRUCTIONS
-		assert '</pattern_learning>' in PATTERN_LEARNING_INSTRUCTIONS
+	def test_instructions_contain_required_tokens(self):
+		"""Instructions are wrapped in <pattern_learning> tags, contain every section and name session_patterns.json."""
+		missing = [token for token in _REQUIRED_INSTRUCTION_TOKENS if token not in PATTERN_LEARNING_INSTRUCTIONS]
+		assert not missing, f'Missing from PATTERN_LEARNING_INSTRUCTIONS: {missing}'
 
-	def test_instructions_contain_key_sections(self):
-		"""Instructions contain all required sections."""
-		assert 'READING PATTERNS' in PATTERN_LEARNING_INSTRUCTIONS
-		assert 'APPLYING KNOWN PATTERNS' in PATTERN_LEARNING_INSTRUCTIONS
-		assert 'DISCOVERING NEW PATTERNS' in PATTERN_LEARNING_INSTRUCTIONS
-		assert 'WHAT TO RECORD' in PATTERN_LEARNING_INSTRUCTIONS
-		assert 'WHAT NOT TO RECORD' in PATTERN_LEARNING_INSTRUCTIONS
 
-	def test_instructions_mention_session_patterns_file(self):
-		"""Instructions mention session_patterns.json for writing."""
-		assert 'session_patterns.json' in PATTERN_LEARNING_INSTRUCTIONS
+_STEP_DESCRIPTIONS = (
+	'Step 1: Navigated to example.com',
+	'Step 2: Clicked search input',
+	'Step 3: Typed "Python tutorials"',
+	'Step 4: Clicked first result',
+	'Step 5: Extracted content',
+)
 
 
-class TestSavePatternSuccessGating:
-	"""Tests for save_patterns() success/failure gating."""
+@dataclass(slots=True)
+class _StubHistory:
+	"""Stand-in for AgentHistoryList exposing only the methods PatternLearningAgent reads."""
 
-	def _create_agent_with_mock_history(self, tmp_dir: str, is_done: bool, is_successful: bool | None):
-		"""Helper: create PatternLearningAgent with mocked history."""
-		mock_llm = create_mock_llm()
-		agent = PatternLearningAgent(
-			task='Test task',
-			llm=mock_llm,
-			patterns_path=Path(tmp_dir) / 'patterns.json',
-		)
+	done: bool
+	successful: bool | None
+	steps: int = 5
 
-		# Mock the history on the inner agent
-		mock_history = MagicMock()
-		mock_history.is_done.return_value = is_done
-		mock_history.is_successful.return_value = is_successful
-		agent._agent.history = mock_history
+	def is_done(self) -> bool:
+		return self.done
 
-		return agent
+	def is_successful(self) -> bool | None:
+		return self.successful
 
-	def _add_session_patterns(self, agent: PatternLearningAgent):
-		"""Helper: add session patterns to agent's FileSystem so merge has data."""
-		session_data = {
-			'version': 1,
-			'patterns': {
-				'example.com': {
-					'cookie_consent': {
-						'actions': ["click 'Accept'"],
-						'last_success': None,
-					}
-				}
-			},
-		}
-		agent._agent.file_system.files[SESSION_PATTERNS_FILENAME] = JsonFile(
-			name='session_patterns', content=json.dumps(session_data)
-		)
+	def number_of_steps(self) -> int:
+		return self.steps
 
-	def test_save_patterns_skips_when_not_done(self):
-		"""save_patterns() returns 0 when task is not completed."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_agent_with_mock_history(tmp_dir, is_done=False, is_successful=None)
-			self._add_session_patterns(agent)
+	def agent_steps(self) -> list[str]:
+		return list(_STEP_DESCRIPTIONS[: self.steps])
 
-			count = agent.save_patterns()
 
-			assert count == 0
+def _add_session_patterns(agent: PatternLearningAgent):
+	"""Add session patterns to agent's FileSystem so merge has data."""
+	agent._agent.file_system.files[SESSION_PATTERNS_FILENAME] = JsonFile(name='session_patterns', content=_EXAMPLE_SESSION_JSON)
 
-	def test_save_patterns_skips_when_not_successful(self):
-		"""save_patterns() returns 0 when task completed but failed."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_agent_with_mock_history(tmp_dir, is_done=True, is_successful=False)
-			self._add_session_patterns(agent)
 
-			count = agent.save_patterns()
-
-			assert count == 0
-
-	def test_save_patterns_skips_when_success_is_none(self):
-		"""save_patterns() returns 0 when is_successful() returns None (not done properly)."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_agent_with_mock_history(tmp_dir, is_done=True, is_successful=None)
-			self._add_session_patterns(agent)
+@pytest.fixture(scope='module')
+def gating_agent(tmp_path_factory) -> PatternLearningAgent:
+	"""One agent for the save gating cases; each case swaps in its own history and store."""
+	return PatternLearningAgent(
+		task='Test task',
+		llm=_shared_mock_llm(),
+		patterns_path=tmp_path_factory.mktemp('gating') / 'patterns.json',
+	)
 
-			count = agent.save_patterns()
 
-			assert count == 0
+class TestSavePatternSuccessGating:
+	"""Tests for save_patterns() success/failure gating."""
 
-	def test_save_patterns_saves_when_successful(self):
-		"""save_patterns() saves patterns when task completed successfully."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_agent_with_mock_history(tmp_dir, is_done=True, is_successful=True)
-			self._add_session_patterns(agent)
+	@pytest.mark.parametrize(
+		'is_done, is_successful, force, expected_count',
+		[
+			(False, None, False, 0),
+			(True, False, False, 0),
+			# is_successful() is None when the task did not finish properly
+			(True, None, False, 0),
+			(True, True, False, 1),
+			# force=True saves even when the task is not done
+			(False, None, True, 1),
+		],
+		ids=['not_done', 'not_successful', 'success_is_none', 'successful', 'force_bypasses_gate'],
+	)
+	def test_save_patterns_gating(self, gating_agent, tmp_path, is_done, is_successful, force, expected_count):
+		"""save_patterns() only merges session patterns for successful tasks unless forced."""
+		# Fresh store and session file per case so no case can see another case's writes
+		gating_agent._store = PatternStore(tmp_path / 'patterns.json')
+		gating_agent._agent.history = _StubHistory(done=is_done, successful=is_successful)
+		_add_session_patterns(gating_agent)
 
-			count = agent.save_patterns()
+		count = gating_agent.save_patterns(force=force)
 
-			assert count == 1
+		assert count == expected_count
+		if expected_count:
 			# Verify pattern was actually persisted
-			loaded = agent._store.load()
+			loaded = gating_agent._store.load()
 			assert 'example.com' in loaded.patterns
 			assert loaded.patterns['example.com']['cookie_consent'].actions == ["click 'Accept'"]
-
-	def test_save_patterns_force_bypasses_gate(self):
-		"""save_patterns(force=True) saves even when task is not done."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_agent_with_mock_history(tmp_dir, is_done=False, is_successful=None)
-			self._add_session_patterns(agent)
-
-			count = agent.save_patterns(force=True)
-
-			assert count == 1
-			# Verify pattern was actually persisted
-			loaded = agent._store.load()
-			assert 'example.com' in loaded.patterns
+		else:
+			assert not gating_agent._store.path.exists()
 
 	def test_pattern_entry_success_field_default(self):
 		"""PatternEntry defaults success to True."""
@@ -600,323 +583,291 @@ class TestWorkflowModels:
 class TestWorkflowStorage:
 	"""Tests for workflow persistence in PatternFile and PatternStore."""
 
-	def test_pattern_file_v2_with_workflows(self):
+	def test_pattern_file_v2_with_workflows(self, tmp_path):
 		"""PatternFile with workflows round-trips through save/load."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			path = Path(tmp_dir) / 'patterns.json'
-			store = PatternStore(path)
-
-			original = PatternFile(
-				patterns={
-					'example.com': {
-						'cookie_consent': PatternEntry(actions=["click 'Accept'"]),
-					}
-				},
-				workflows={
-					'example.com': {
-						'login_flow': WorkflowPattern(
-							id='login_flow',
-							description='Standard login',
-							steps=[
-								WorkflowStep(
-									environment_state='Login page',
-									reasoning='Enter credentials',
-									action='Fill username and password fields',
-								),
-								WorkflowStep(
-									environment_state='Credentials entered',
-									reasoning='Submit form',
-									action='Click submit button',
-								),
-							],
-							domain='example.com',
-							last_success='2024-06-01',
-						),
-					},
+		path = tmp_path / 'patterns.json'
+		store = PatternStore(path)
+
+		original = PatternFile(
+			patterns={
+				'example.com': {
+					'cookie_consent': PatternEntry(actions=["click 'Accept'"]),
+				}
+			},
+			workflows={
+				'example.com': {
+					'login_flow': WorkflowPattern(
+						id='login_flow',
+						description='Standard login',
+						steps=[
+							WorkflowStep(
+								environment_state='Login page',
+								reasoning='Enter credentials',
+								action='Fill username and password fields',
+							),
+							WorkflowStep(
+								environment_state='Credentials entered',
+								reasoning='Submit form',
+								action='Click submit button',
+							),
+						],
+						domain='example.com',
+						last_success='2024-06-01',
+					),
 				},
-			)
+			},
+		)
 
-			store.save(original)
-			loaded = store.load()
+		store.save(original)
+		loaded = store.load()
 
-			assert loaded.version == 2
-			assert 'example.com' in loaded.workflows
-			assert 'login_flow' in loaded.workflows['example.com']
-			wf = loaded.workflows['example.com']['login_flow']
-			assert wf.description == 'Standard login'
-			assert len(wf.steps) == 2
-			assert wf.steps[0].environment_state == 'Login page'
+		assert loaded.version == 2
+		assert loaded.model_dump() == original.model_dump()
 
-	def test_pattern_file_v1_backward_compat(self):
+	def test_pattern_file_v1_backward_compat(self, v1_patterns_path):
 		"""v1 JSON without workflows key loads fine."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			path = Path(tmp_dir) / 'patterns.json'
-			# Write v1 format (no workflows key)
-			v1_data = {
-				'version': 1,
-				'patterns': {
-					'example.com': {
-						'cookie_consent': {
-							'actions': ["click 'Accept'"],
-							'last_success': '2024-01-15',
-						}
-					}
-				},
-			}
-			path.write_text(json.dumps(v1_data))
+		store = PatternStore(v1_patterns_path)
+		loaded = store.load()
 
-			store = PatternStore(path)
-			loaded = store.load()
-
-			assert 'example.com' in loaded.patterns
-			assert loaded.workflows == {}
+		assert loaded.model_dump() == {
+			'version': 1,
+			'patterns': {
+				'example.com': {
+					'cookie_consent': {'actions': ["click 'Accept'"], 'last_success': '2024-01-15', 'success': True},
+				}
+			},
+			'workflows': {},
+		}
 
-	def test_merge_workflows_adds_new(self):
+	def test_merge_workflows_adds_new(self, tmp_path):
 		"""merge_workflows adds workflows to empty store."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			store = PatternStore(Path(tmp_dir) / 'patterns.json')
+		store = PatternStore(tmp_path / 'patterns.json')
+
+		workflows = [
+			WorkflowPattern(
+				id='search',
+				description='Search flow',
+				steps=[WorkflowStep(environment_state='s', reasoning='r', action='a')],
+				domain='example.com',
+			),
+		]
+
+		count = store.merge_workflows(workflows)
+
+		assert count == 1
+		loaded = store.load()
+		assert 'example.com' in loaded.workflows
+		assert 'search' in loaded.workflows['example.com']
+		assert loaded.workflows['example.com']['search'].last_success == date.today().isoformat()
+
+	def test_merge_workflows_updates_existing(self, tmp_path):
+		"""merge_workflows overwrites existing workflow by domain/id."""
+		path = tmp_path / 'patterns.json'
+		store = PatternStore(path)
 
-			workflows = [
+		# Add initial workflow
+		store.merge_workflows(
+			[
 				WorkflowPattern(
-					id='search',
-					description='Search flow',
-					steps=[WorkflowStep(environment_state='s', reasoning='r', action='a')],
-					domain='example.com',
+					id='login',
+					description='Old login',
+					steps=[WorkflowStep(environment_state='s', reasoning='r', action='old')],
+					domain='site.com',
 				),
 			]
+		)
 
-			count = store.merge_workflows(workflows)
-
-			assert count == 1
-			loaded = store.load()
-			assert 'example.com' in loaded.workflows
-			assert 'search' in loaded.workflows['example.com']
-			assert loaded.workflows['example.com']['search'].last_success == date.today().isoformat()
-
-	def test_merge_workflows_updates_existing(self):
-		"""merge_workflows overwrites existing workflow by domain/id."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			path = Path(tmp_dir) / 'patterns.json'
-			store = PatternStore(path)
-
-			# Add initial workflow
-			store.merge_workflows(
-				[
-					WorkflowPattern(
-						id='login',
-						description='Old login',
-						steps=[WorkflowStep(environment_state='s', reasoning='r', action='old')],
-						domain='site.com',
-					),
-				]
-			)
-
-			# Update with new version
-			count = store.merge_workflows(
-				[
-					WorkflowPattern(
-						id='login',
-						description='New login',
-						steps=[
-							WorkflowStep(environment_state='s1', reasoning='r1', action='new1'),
-							WorkflowStep(environment_state='s2', reasoning='r2', action='new2'),
-						],
-						domain='site.com',
-					),
-				]
-			)
+		# Update with new version
+		count = store.merge_workflows(
+			[
+				WorkflowPattern(
+					id='login',
+					description='New login',
+					steps=[
+						WorkflowStep(environment_state='s1', reasoning='r1', action='new1'),
+						WorkflowStep(environment_state='s2', reasoning='r2', action='new2'),
+					],
+					domain='site.com',
+				),
+			]
+		)
 
-			assert count == 1
-			loaded = store.load()
-			wf = loaded.workflows['site.com']['login']
-			assert wf.description == 'New login'
-			assert len(wf.steps) == 2
+		assert count == 1
+		loaded = store.load()
+		wf = loaded.workflows['site.com']['login']
+		assert wf.description == 'New login'
+		assert len(wf.steps) == 2
 
-	def test_merge_workflows_empty_list(self):
+	def test_merge_workflows_empty_list(self, tmp_path):
 		"""merge_workflows([]) returns 0 and doesn't write."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			path = Path(tmp_dir) / 'patterns.json'
-			store = PatternStore(path)
+		path = tmp_path / 'patterns.json'
+		store = PatternStore(path)
+
+		count = store.merge_workflows([])
+
+		assert count == 0
+		assert not path.exists()
+
+	def test_merge_workflows_saves_once_per_batch(self, tmp_path):
+		"""merge_workflows loads and saves the store once for the whole batch, not per workflow."""
+		store = PatternStore(tmp_path / 'patterns.json')
+		workflows = [
+			WorkflowPattern(
+				id=f'flow_{i}',
+				description=f'Flow {i}',
+				steps=[WorkflowStep(environment_state='s', reasoning='r', action='a')],
+				domain='example.com',
+			)
+			for i in range(3)
+		]
 
-			count = store.merge_workflows([])
+		with patch.object(store, 'save', wraps=store.save) as mock_save:
+			count = store.merge_workflows(workflows)
 
-			assert count == 0
-			assert not path.exists()
+		assert count == 3
+		assert mock_save.call_count == 1
+		assert set(store.load().workflows['example.com']) == {'flow_0', 'flow_1', 'flow_2'}
 
 
-class TestInduceWorkflows:
-	"""Tests for induce_workflows() method with mocked LLM."""
+@pytest.fixture
+def make_agent(tmp_path):
+	"""Factory for agents with a stubbed history whose run() returns that history without driving a browser."""
 
-	def _create_agent_with_mock_history(
-		self,
-		tmp_dir: str,
-		is_done: bool,
-		is_successful: bool | None,
+	def _make(
+		is_done: bool = True,
+		is_successful: bool | None = True,
 		num_steps: int = 5,
-		induction_prompt: str | None = None,
-	):
-		"""Helper: create PatternLearningAgent with mocked history."""
-		mock_llm = create_mock_llm()
+		**agent_kwargs,
+	) -> PatternLearningAgent:
 		agent = PatternLearningAgent(
 			task='Search for Python tutorials on example.com',
-			llm=mock_llm,
-			patterns_path=Path(tmp_dir) / 'patterns.json',
-			induction_prompt=induction_prompt,
+			llm=_shared_mock_llm(),
+			patterns_path=tmp_path / 'patterns.json',
+			**agent_kwargs,
 		)
-
-		# Mock the history on the inner agent
-		mock_history = MagicMock()
-		mock_history.is_done.return_value = is_done
-		mock_history.is_successful.return_value = is_successful
-		mock_history.number_of_steps.return_value = num_steps
-		mock_history.agent_steps.return_value = [
-			'Step 1: Navigated to example.com',
-			'Step 2: Clicked search input',
-			'Step 3: Typed "Python tutorials"',
-			'Step 4: Clicked first result',
-			'Step 5: Extracted content',
-		][:num_steps]
-		agent._agent.history = mock_history
-
+		history = _StubHistory(done=is_done, successful=is_successful, steps=num_steps)
+		agent._agent.history = history
+		agent._agent.run = AsyncMock(return_value=history)
 		return agent
 
-	@pytest.mark.asyncio
-	async def test_induce_workflows_skips_when_not_done(self):
-		"""induce_workflows() returns 0 when task not completed, no LLM call."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_agent_with_mock_history(tmp_dir, is_done=False, is_successful=None)
+	return _make
 
-			count = await agent.induce_workflows()
 
-			assert count == 0
-			# LLM should not have been called for induction
-			# (it was called once during Agent init for settings, but not for induction)
+# LLM induction result with no workflows; nothing downstream mutates it
+_EMPTY_INDUCED = InducedWorkflows(workflows=[])
 
-	@pytest.mark.asyncio
-	async def test_induce_workflows_skips_when_not_successful(self):
-		"""induce_workflows() returns 0 when task not successful."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_agent_with_mock_history(tmp_dir, is_done=True, is_successful=False)
 
-			count = await agent.induce_workflows()
+@pytest.fixture(scope='module')
+def induction_skip_agent(tmp_path_factory) -> PatternLearningAgent:
+	"""One agent for the induce_workflows skip cases; each case swaps in its own history."""
+	return PatternLearningAgent(
+		task='Search for Python tutorials on example.com',
+		llm=_shared_mock_llm(),
+		patterns_path=tmp_path_factory.mktemp('induction') / 'patterns.json',
+	)
 
-			assert count == 0
+
+class TestInduceWorkflows:
+	"""Tests for induce_workflows() method with mocked LLM."""
 
 	@pytest.mark.asyncio
-	async def test_induce_workflows_skips_few_steps(self):
-		"""induce_workflows() returns 0 when < 3 steps."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_agent_with_mock_history(tmp_dir, is_done=True, is_successful=True, num_steps=2)
+	@pytest.mark.parametrize(
+		'is_done, is_successful, num_steps',
+		[
+			(False, None, 5),
+			(True, False, 5),
+			# Fewer than 3 steps is too short to induce a workflow from
+			(True, True, 2),
+		],
+		ids=['not_done', 'not_successful', 'few_steps'],
+	)
+	async def test_induce_workflows_skips(self, induction_skip_agent, is_done, is_successful, num_steps):
+		"""induce_workflows() returns 0 without calling the induction LLM when a gate fails."""
+		induction_skip_agent._agent.history = _StubHistory(done=is_done, successful=is_successful, steps=num_steps)
 
-			count = await agent.induce_workflows()
+		count = await induction_skip_agent.induce_workflows()
 
-			assert count == 0
+		assert count == 0
 
 	@pytest.mark.asyncio
-	async def test_induce_workflows_calls_llm_on_success(self):
+	async def test_induce_workflows_calls_llm_on_success(self, make_agent):
 		"""induce_workflows() calls LLM and merges results on success."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_agent_with_mock_history(tmp_dir, is_done=True, is_successful=True, num_steps=5)
-
-			# Mock the page_extraction_llm to return workflows
-			from unittest.mock import AsyncMock
-
-			from browser_use.llm.views import ChatInvokeCompletion
+		agent = make_agent(is_done=True, is_successful=True, num_steps=5)
 
-			mock_extraction_llm = AsyncMock()
-			induced = InducedWorkflows(
-				workflows=[
-					WorkflowPattern(
-						id='search_flow',
-						description='Search and select result',
-						steps=[
-							WorkflowStep(environment_state='Home page', reasoning='Start search', action='Click search'),
-							WorkflowStep(environment_state='Search focused', reasoning='Enter query', action='Type and submit'),
-						],
-						domain='example.com',
-					),
-				]
-			)
-			mock_extraction_llm.ainvoke.return_value = ChatInvokeCompletion(completion=induced, usage=None)
-			agent._agent.settings.page_extraction_llm = mock_extraction_llm
+		# Mock the page_extraction_llm to return workflows
+		mock_extraction_llm = AsyncMock()
+		induced = InducedWorkflows(
+			workflows=[
+				WorkflowPattern(
+					id='search_flow',
+					description='Search and select result',
+					steps=[
+						WorkflowStep(environment_state='Home page', reasoning='Start search', action='Click search'),
+						WorkflowStep(environment_state='Search focused', reasoning='Enter query', action='Type and submit'),
+					],
+					domain='example.com',
+				),
+			]
+		)
+		mock_extraction_llm.ainvoke.return_value = ChatInvokeCompletion(completion=induced, usage=None)
+		agent._agent.settings.page_extraction_llm = mock_extraction_llm
 
-			count = await agent.induce_workflows()
+		count = await agent.induce_workflows()
 
-			assert count == 1
-			mock_extraction_llm.ainvoke.assert_called_once()
-			# Verify workflow was persisted
-			loaded = agent._store.load()
-			assert 'example.com' in loaded.workflows
-			assert 'search_flow' in loaded.workflows['example.com']
+		assert count == 1
+		mock_extraction_llm.ainvoke.assert_called_once()
+		# Verify workflow was persisted
+		loaded = agent._store.load()
+		assert 'example.com' in loaded.workflows
+		assert 'search_flow' in loaded.workflows['example.com']
 
 	@pytest.mark.asyncio
-	async def test_induce_workflows_force_bypasses_gate(self):
+	async def test_induce_workflows_force_bypasses_gate(self, make_agent):
 		"""induce_workflows(force=True) skips all checks."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_agent_with_mock_history(tmp_dir, is_done=False, is_successful=None, num_steps=1)
+		agent = make_agent(is_done=False, is_successful=None, num_steps=1)
 
-			# Mock the page_extraction_llm to return empty workflows
-			from unittest.mock import AsyncMock
+		# Mock the page_extraction_llm to return empty workflows
+		mock_extraction_llm = AsyncMock()
+		mock_extraction_llm.ainvoke.return_value = ChatInvokeCompletion(completion=_EMPTY_INDUCED, usage=None)
+		agent._agent.settings.page_extraction_llm = mock_extraction_llm
 
-			from browser_use.llm.views import ChatInvokeCompletion
+		count = await agent.induce_workflows(force=True)
 
-			mock_extraction_llm = AsyncMock()
-			induced = InducedWorkflows(workflows=[])
-			mock_extraction_llm.ainvoke.return_value = ChatInvokeCompletion(completion=induced, usage=None)
-			agent._agent.settings.page_extraction_llm = mock_extraction_llm
-
-			count = await agent.induce_workflows(force=True)
-
-			assert count == 0  # No workflows returned, but LLM was called
-			mock_extraction_llm.ainvoke.assert_called_once()
+		assert count == 0  # No workflows returned, but LLM was called
+		mock_extraction_llm.ainvoke.assert_called_once()
 
 	@pytest.mark.asyncio
-	async def test_induce_workflows_handles_llm_error(self):
+	async def test_induce_workflows_handles_llm_error(self, make_agent):
 		"""induce_workflows() returns 0 on LLM exception."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_agent_with_mock_history(tmp_dir, is_done=True, is_successful=True, num_steps=5)
+		agent = make_agent(is_done=True, is_successful=True, num_steps=5)
 
-			# Mock the page_extraction_llm to raise
-			from unittest.mock import AsyncMock
+		# Mock the page_extraction_llm to raise
+		mock_extraction_llm = AsyncMock()
+		mock_extraction_llm.ainvoke.side_effect = RuntimeError('LLM connection failed')
+		agent._agent.settings.page_extraction_llm = mock_extraction_llm
 
-			mock_extraction_llm = AsyncMock()
-			mock_extraction_llm.ainvoke.side_effect = RuntimeError('LLM connection failed')
-			agent._agent.settings.page_extraction_llm = mock_extraction_llm
+		count = await agent.induce_workflows()
 
-			count = await agent.induce_workflows()
-
-			assert count == 0
+		assert count == 0
 
 	@pytest.mark.asyncio
-	async def test_induce_workflows_custom_prompt(self):
+	async def test_induce_workflows_custom_prompt(self, make_agent):
 		"""Custom induction_prompt is used in LLM call."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			custom_prompt = 'Custom induction prompt for task: {task}\nSteps: {steps}'
-			agent = self._create_agent_with_mock_history(
-				tmp_dir,
-				is_done=True,
-				is_successful=True,
-				num_steps=5,
-				induction_prompt=custom_prompt,
-			)
+		custom_prompt = 'Custom induction prompt for task: {task}\nSteps: {steps}'
+		agent = make_agent(is_done=True, is_successful=True, num_steps=5, induction_prompt=custom_prompt)
 
-			# Mock the page_extraction_llm
-			from unittest.mock import AsyncMock
+		# Mock the page_extraction_llm
+		mock_extraction_llm = AsyncMock()
+		mock_extraction_llm.ainvoke.return_value = ChatInvokeCompletion(completion=_EMPTY_INDUCED, usage=None)
+		agent._agent.settings.page_extraction_llm = mock_extraction_llm
 
-			from browser_use.llm.views import ChatInvokeCompletion
+		await agent.induce_workflows()
 
-			mock_extraction_llm = AsyncMock()
-			induced = InducedWorkflows(workflows=[])
-			mock_extraction_llm.ainvoke.return_value = ChatInvokeCompletion(completion=induced, usage=None)
-			agent._agent.settings.page_extraction_llm = mock_extraction_llm
-
-			await agent.induce_workflows()
-
-			# Verify the custom prompt was used
-			call_args = mock_extraction_llm.ainvoke.call_args
-			messages = call_args[0][0]  # First positional arg is messages list
-			assert 'Custom induction prompt for task:' in messages[0].content
-			assert 'Search for Python tutorials' in messages[0].content
+		# Verify the custom prompt was used
+		call_args = mock_extraction_llm.ainvoke.call_args
+		messages = call_args[0][0]  # First positional arg is messages list
+		assert 'Custom induction prompt for task:' in messages[0].content
+		assert 'Search for Python tutorials' in messages[0].content
 
 
 class TestWorkflowInstructions:
@@ -946,206 +897,139 @@ class TestWorkflowInstructions:
 class TestAutoLearn:
 	"""Tests for auto_learn mode in PatternLearningAgent."""
 
-	def _create_auto_learn_agent(
-		self,
-		tmp_dir: str,
-		auto_learn: bool,
-		is_done: bool = True,
-		is_successful: bool | None = True,
-		num_steps: int = 5,
-	):
-		"""Helper: create PatternLearningAgent with auto_learn and mocked history."""
-		mock_llm = create_mock_llm()
-		agent = PatternLearningAgent(
-			task='Search for Python tutorials on example.com',
-			llm=mock_llm,
-			patterns_path=Path(tmp_dir) / 'patterns.json',
-			auto_learn=auto_learn,
-		)
-
-		# Mock history
-		mock_history = MagicMock()
-		mock_history.is_done.return_value = is_done
-		mock_history.is_successful.return_value = is_successful
-		mock_history.number_of_steps.return_value = num_steps
-		mock_history.agent_steps.return_value = [
-			'Step 1: Navigated to example.com',
-			'Step 2: Clicked search input',
-			'Step 3: Typed "Python tutorials"',
-			'Step 4: Clicked first result',
-			'Step 5: Extracted content',
-		][:num_steps]
-		agent._agent.history = mock_history
-
-		# Mock agent.run() to return history without actually running
-		from unittest.mock import AsyncMock
-
-		agent._agent.run = AsyncMock(return_value=mock_history)
-
-		return agent
-
-	def _add_session_patterns(self, agent):
-		"""Add session patterns to agent's file system."""
-		session_data = {
-			'version': 2,
-			'patterns': {
-				'example.com': {
-					'cookie_consent': {'actions': ["click 'Accept'"], 'last_success': None},
-				}
-			},
-		}
-		agent._agent.file_system.files[SESSION_PATTERNS_FILENAME] = JsonFile(
-			name='session_patterns', content=json.dumps(session_data)
-		)
-
 	def _mock_extraction_llm(self, agent, workflows=None):
 		"""Mock page_extraction_llm to return given workflows."""
-		from unittest.mock import AsyncMock
-
-		from browser_use.llm.views import ChatInvokeCompletion
-
 		mock_llm = AsyncMock()
 		induced = InducedWorkflows(workflows=workflows or [])
 		mock_llm.ainvoke.return_value = ChatInvokeCompletion(completion=induced, usage=None)
 		agent._agent.settings.page_extraction_llm = mock_llm
 		return mock_llm
 
-	def test_auto_learn_defaults_to_false(self):
+	def test_auto_learn_defaults_to_false(self, tmp_path):
 		"""auto_learn defaults to False."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			mock_llm = create_mock_llm()
-			agent = PatternLearningAgent(
-				task='test',
-				llm=mock_llm,
-				patterns_path=Path(tmp_dir) / 'patterns.json',
-			)
-			assert agent._auto_learn is False
+		mock_llm = _shared_mock_llm()
+		agent = PatternLearningAgent(
+			task='test',
+			llm=mock_llm,
+			patterns_path=tmp_path / 'patterns.json',
+		)
+		assert agent._auto_learn is False
 
-	def test_auto_learn_can_be_enabled(self):
+	def test_auto_learn_can_be_enabled(self, tmp_path):
 		"""auto_learn=True is stored."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			mock_llm = create_mock_llm()
-			agent = PatternLearningAgent(
-				task='test',
-				llm=mock_llm,
-				patterns_path=Path(tmp_dir) / 'patterns.json',
-				auto_learn=True,
-			)
-			assert agent._auto_learn is True
+		mock_llm = _shared_mock_llm()
+		agent = PatternLearningAgent(
+			task='test',
+			llm=mock_llm,
+			patterns_path=tmp_path / 'patterns.json',
+			auto_learn=True,
+		)
+		assert agent._auto_learn is True
 
 	@pytest.mark.asyncio
-	async def test_auto_learn_off_does_not_save(self):
+	async def test_auto_learn_off_does_not_save(self, make_agent, tmp_path):
 		"""With auto_learn=False, run() does not call save_patterns or induce_workflows."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_auto_learn_agent(tmp_dir, auto_learn=False)
-			self._add_session_patterns(agent)
-			self._mock_extraction_llm(agent)
+		agent = make_agent(auto_learn=False)
+		_add_session_patterns(agent)
+		self._mock_extraction_llm(agent)
 
-			await agent.run()
+		await agent.run()
 
-			# Patterns should NOT be saved (no auto-learn)
-			patterns_path = Path(tmp_dir) / 'patterns.json'
-			assert not patterns_path.exists()
+		# Patterns should NOT be saved (no auto-learn)
+		patterns_path = tmp_path / 'patterns.json'
+		assert not patterns_path.exists()
 
 	@pytest.mark.asyncio
-	async def test_auto_learn_on_saves_patterns(self):
+	async def test_auto_learn_on_saves_patterns(self, make_agent):
 		"""With auto_learn=True and successful task, patterns are saved after run()."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_auto_learn_agent(tmp_dir, auto_learn=True)
-			self._add_session_patterns(agent)
-			self._mock_extraction_llm(agent)
+		agent = make_agent(auto_learn=True)
+		_add_session_patterns(agent)
+		self._mock_extraction_llm(agent)
 
-			await agent.run()
+		await agent.run()
 
-			# Patterns should be saved
-			loaded = agent._store.load()
-			assert 'example.com' in loaded.patterns
-			assert 'cookie_consent' in loaded.patterns['example.com']
+		# Patterns should be saved
+		loaded = agent._store.load()
+		assert 'example.com' in loaded.patterns
+		assert 'cookie_consent' in loaded.patterns['example.com']
 
 	@pytest.mark.asyncio
-	async def test_auto_learn_on_induces_workflows(self):
+	async def test_auto_learn_on_induces_workflows(self, make_agent):
 		"""With auto_learn=True and successful task, workflows are induced after run()."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_auto_learn_agent(tmp_dir, auto_learn=True)
-			mock_llm = self._mock_extraction_llm(
-				agent,
-				workflows=[
-					WorkflowPattern(
-						id='search',
-						description='Search flow',
-						steps=[
-							WorkflowStep(environment_state='s', reasoning='r', action='a'),
-							WorkflowStep(environment_state='s2', reasoning='r2', action='a2'),
-						],
-						domain='example.com',
-					),
-				],
-			)
+		agent = make_agent(auto_learn=True)
+		mock_llm = self._mock_extraction_llm(
+			agent,
+			workflows=[
+				WorkflowPattern(
+					id='search',
+					description='Search flow',
+					steps=[
+						WorkflowStep(environment_state='s', reasoning='r', action='a'),
+						WorkflowStep(environment_state='s2', reasoning='r2', action='a2'),
+					],
+					domain='example.com',
+				),
+			],
+		)
 
-			await agent.run()
+		await agent.run()
 
-			# Workflow induction LLM should have been called
-			mock_llm.ainvoke.assert_called_once()
-			# Workflow should be persisted
-			loaded = agent._store.load()
-			assert 'example.com' in loaded.workflows
-			assert 'search' in loaded.workflows['example.com']
+		# Workflow induction LLM should have been called
+		mock_llm.ainvoke.assert_called_once()
+		# Workflow should be persisted
+		loaded = agent._store.load()
+		assert 'example.com' in loaded.workflows
+		assert 'search' in loaded.workflows['example.com']
 
 	@pytest.mark.asyncio
-	async def test_auto_learn_skips_on_failure(self):
+	async def test_auto_learn_skips_on_failure(self, make_agent, tmp_path):
 		"""With auto_learn=True but failed task, nothing is saved."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_auto_learn_agent(tmp_dir, auto_learn=True, is_done=True, is_successful=False)
-			self._add_session_patterns(agent)
-			mock_llm = self._mock_extraction_llm(agent)
+		agent = make_agent(auto_learn=True, is_done=True, is_successful=False)
+		_add_session_patterns(agent)
+		mock_llm = self._mock_extraction_llm(agent)
 
-			await agent.run()
+		await agent.run()
 
-			# Nothing saved — success gate blocks both
-			patterns_path = Path(tmp_dir) / 'patterns.json'
-			assert not patterns_path.exists()
-			mock_llm.ainvoke.assert_not_called()
+		# Nothing saved — success gate blocks both
+		patterns_path = tmp_path / 'patterns.json'
+		assert not patterns_path.exists()
+		mock_llm.ainvoke.assert_not_called()
 
 	@pytest.mark.asyncio
-	async def test_auto_learn_skips_on_not_done(self):
+	async def test_auto_learn_skips_on_not_done(self, make_agent, tmp_path):
 		"""With auto_learn=True but task not done, nothing is saved."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_auto_learn_agent(tmp_dir, auto_learn=True, is_done=False, is_successful=None)
-			self._add_session_patterns(agent)
-			mock_llm = self._mock_extraction_llm(agent)
+		agent = make_agent(auto_learn=True, is_done=False, is_successful=None)
+		_add_session_patterns(agent)
+		mock_llm = self._mock_extraction_llm(agent)
 
-			await agent.run()
+		await agent.run()
 
-			patterns_path = Path(tmp_dir) / 'patterns.json'
-			assert not patterns_path.exists()
-			mock_llm.ainvoke.assert_not_called()
+		patterns_path = tmp_path / 'patterns.json'
+		assert not patterns_path.exists()
+		mock_llm.ainvoke.assert_not_called()
 
 	@pytest.mark.asyncio
-	async def test_auto_learn_returns_history(self):
+	async def test_auto_learn_returns_history(self, make_agent):
 		"""run() returns history regardless of auto_learn setting."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_auto_learn_agent(tmp_dir, auto_learn=True)
-			self._mock_extraction_llm(agent)
+		agent = make_agent(auto_learn=True)
+		self._mock_extraction_llm(agent)
 
-			result = await agent.run()
+		result = await agent.run()
 
-			# Should return the mock history
-			assert result is not None
-			assert result.is_done() is True
+		# Should return the mock history
+		assert result is not None
+		assert result.is_done() is True
 
 	@pytest.mark.asyncio
-	async def test_auto_learn_exception_does_not_propagate(self):
+	async def test_auto_learn_exception_does_not_propagate(self, make_agent):
 		"""Exceptions in auto-learn don't crash run()."""
-		with tempfile.TemporaryDirectory() as tmp_dir:
-			agent = self._create_auto_learn_agent(tmp_dir, auto_learn=True)
+		agent = make_agent(auto_learn=True)
 
-			# Mock extraction LLM to raise
-			from unittest.mock import AsyncMock
-
-			mock_llm = AsyncMock()
-			mock_llm.ainvoke.side_effect = RuntimeError('LLM exploded')
-			agent._agent.settings.page_extraction_llm = mock_llm
+		# Mock extraction LLM to raise
+		mock_llm = AsyncMock()
+		mock_llm.ainvoke.side_effect = RuntimeError('LLM exploded')
+		agent._agent.settings.page_extraction_llm = mock_llm
 
-			# Should not raise
-			result = await agent.run()
-			assert result is not None
+		# Should not raise
+		result = await agent.run()
+		assert result is not None
@@ -40,51 +40,43 @@ class TestIsPopup:
 
 	def test_dialog_open_is_popup(self):
 		"""<dialog open> should be detected as popup."""
-		serializer = HTMLSerializer()
 		node = create_mock_node(node_name='dialog', attributes={'open': ''})
-		assert serializer._is_popup(node) is True
+		assert HTMLSerializer._is_popup(node) is True
 
 	def test_dialog_without_open_not_popup(self):
 		"""<dialog> without open attribute should not be detected as popup."""
-		serializer = HTMLSerializer()
 		node = create_mock_node(node_name='dialog', attributes={})
-		assert serializer._is_popup(node) is False
+		assert HTMLSerializer._is_popup(node) is False
 
 	def test_role_dialog_is_popup(self):
 		"""Element with role="dialog" should be detected as popup."""
-		serializer = HTMLSerializer()
 		node = create_mock_node(node_name='div', attributes={'role': 'dialog'})
-		assert serializer._is_popup(node) is True
+		assert HTMLSerializer._is_popup(node) is True
 
 	def test_role_alertdialog_is_popup(self):
 		"""Element with role="alertdialog" should be detected as popup."""
-		serializer = HTMLSerializer()
 		node = create_mock_node(node_name='div', attributes={'role': 'alertdialog'})
-		assert serializer._is_popup(node) is True
+		assert HTMLSerializer._is_popup(node) is True
 
 	def test_aria_modal_true_is_popup(self):
 		"""Element with aria-modal="true" should be detected as popup."""
-		serializer = HTMLSerializer()
 		node = create_mock_node(node_name='div', attributes={'aria-modal': 'true'})
-		assert serializer._is_popup(node) is True
+		assert HTMLSerializer._is_popup(node) is True
 
 	def test_aria_modal_false_not_popup(self):
 		"""Element with aria-modal="false" should not be detected as popup."""
-		serializer = HTMLSerializer()
 		node = create_mock_node(node_name='div', attributes={'aria-modal': 'false'})
-		assert serializer._is_popup(node) is False
+		assert HTMLSerializer._is_popup(node) is False
 
 	def test_regular_div_not_popup(self):
 		"""Regular div should not be detected as popup."""
-		serializer = HTMLSerializer()
 		node = create_mock_node(node_name='div', attributes={'class': 'content'})
-		assert serializer._is_popup(node) is False
+		assert HTMLSerializer._is_popup(node) is False
 
 	def test_text_node_not_popup(self):
 		"""Text nodes should not be detected as popup."""
-		serializer = HTMLSerializer()
 		node = create_mock_node(node_type=NodeType.TEXT_NODE, node_name='#text')
-		assert serializer._is_popup(node) is False
+		assert HTMLSerializer._is_popup(node) is False
 
 
 class TestDetectPopups:
@@ -122,7 +114,7 @@ class TestDetectPopups:
 		)
 
 		popups = serializer.detect_popups(root)
-		assert len(popups) == 2
+		assert popups == [popup1, popup2]
 
 	def test_no_popups_returns_empty(self):
 		"""Should return empty list when no popups found."""
@@ -140,6 +132,24 @@ class TestDetectPopups:
 		popups = serializer.detect_popups(root)
 		assert len(popups) == 0
 
+	def test_skips_popups_in_non_content_subtrees(self):
+		"""Popups inside subtrees the serializer drops (e.g. <head>) are not reported."""
+		serializer = HTMLSerializer()
+
+		hidden_popup = create_mock_node(node_name='div', attributes={'role': 'dialog'})
+		head = create_mock_node(node_name='head', children=[hidden_popup])
+		visible_popup = create_mock_node(node_name='dialog', attributes={'open': ''})
+		body = create_mock_node(node_name='body', children=[visible_popup])
+
+		root = create_mock_node(
+			node_type=NodeType.DOCUMENT_NODE,
+			node_name='#document',
+			children=[head, body],
+		)
+
+		assert serializer.detect_popups(root) == [visible_popup]
+		assert serializer.serialize_without_popups(root)[1] == [visible_popup]
+
 
 class TestSerializeExcluding:
 	"""Tests for HTMLSerializer.serialize_excluding method."""
@@ -183,6 +193,27 @@ class TestSerializeExcluding:
 		html = serializer.serialize_excluding(root, set())
 		assert 'Content' in html
 
+	def test_serialize_without_popups_matches_two_pass(self):
+		"""Single-walk serialization should match detect_popups + serialize_excluding."""
+		serializer = HTMLSerializer()
+
+		popup = create_mock_node(node_name='dialog', attributes={'open': ''})
+		text_node = create_mock_node(node_type=NodeType.TEXT_NODE, node_name='#text')
+		text_node.node_value = 'Hello World'
+		regular = create_mock_node(node_name='div', attributes={}, children=[text_node])
+
+		root = create_mock_node(
+			node_type=NodeType.DOCUMENT_NODE,
+			node_name='#document',
+			children=[regular, popup],
+		)
+
+		html, popups = serializer.serialize_without_popups(root)
+
+		assert popups == [popup]
+		assert html == serializer.serialize_excluding(root, {id(popup)})
+		assert '<dialog' not in html
+
 
 class TestPopupRolesConstant:
 	"""Tests for _POPUP_ROLES constant."""